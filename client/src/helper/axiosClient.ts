@@ -46,3 +46,39 @@ axiosClient.interceptors.response.use(
     return Promise.reject(error);
   }
 );
+
+// Fetch every page of a cursor-paginated list by following the X-Next-Cursor header
+export const fetchAllPages = async <T>(
+  url: string,
+  params: Record<string, unknown> = {}
+): Promise<T[]> => {
+  const items: T[] = [];
+  let cursor: string | undefined;
+  do {
+    const response = await axiosClient.get<T[]>(url, { params: { ...params, cursor } });
+    items.push(...response.data);
+    cursor = response.headers["x-next-cursor"];
+  } while (cursor);
+  return items;
+};
+
+// Same for lists wrapped in an object such as { count, notes }: concatenates body[key]
+// across pages and keeps the other fields (e.g. the total count) from the first page
+export const fetchAllPagesOf = async <T extends Record<string, any>>(
+  url: string,
+  key: keyof T & string,
+  params: Record<string, unknown> = {}
+): Promise<T> => {
+  let body: T | undefined;
+  let cursor: string | undefined;
+  do {
+    const response = await axiosClient.get<T>(url, { params: { ...params, cursor } });
+    if (body) {
+      body[key].push(...response.data[key]);
+    } else {
+      body = response.data;
+    }
+    cursor = response.headers["x-next-cursor"];
+  } while (cursor);
+  return body as T;
+};
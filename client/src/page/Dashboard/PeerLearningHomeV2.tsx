@@ -17,7 +17,7 @@ import {
   Video,
   MessageSquare,
 } from "lucide-react";
-import { axiosClient } from "@/helper/axiosClient";
+import { axiosClient, fetchAllPages } from "@/helper/axiosClient";
 import { toast } from "react-toastify";
 import type { PeerLearningSession } from "@/types/peerLearning";
 import type { TeachSession } from "@/types/teachSession";
@@ -48,12 +48,12 @@ export default function PeerLearningHomeV2() {
 
   const checkQualification = async () => {
     try {
-      // Get all teach sessions
-      const response = await axiosClient.get<TeachSession[]>("/teach-sessions/sessions");
+      // Get all teach sessions (the list is paged, so follow the cursor)
+      const sessions = await fetchAllPages<TeachSession>("/teach-sessions/sessions");
       
       // Find best score
       let highestScore = 0;
-      response.data.forEach((session) => {
+      sessions.forEach((session) => {
         if (session.clarity_score && session.completeness_score && session.status === "completed") {
           const avgScore = (session.clarity_score + session.completeness_score) / 2;
           if (avgScore > highestScore) {
@@ -72,9 +72,9 @@ export default function PeerLearningHomeV2() {
   const fetchAvailableSessions = async () => {
     try {
       // Fetch both waiting and active sessions (don't filter by status)
-      const response = await axiosClient.get<PeerLearningSession[]>("/peer-learning/sessions");
+      const sessions = await fetchAllPages<PeerLearningSession>("/peer-learning/sessions");
       // Filter out completed sessions on the client side
-      const availableSessions = response.data.filter(
+      const availableSessions = sessions.filter(
         (session) => session.status === "waiting" || session.status === "active"
       );
       setAvailableSessions(availableSessions);
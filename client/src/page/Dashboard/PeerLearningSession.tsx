@@ -18,7 +18,7 @@ import {
   FileText,
   BookOpen,
 } from "lucide-react";
-import { axiosClient } from "@/helper/axiosClient";
+import { axiosClient, fetchAllPages } from "@/helper/axiosClient";
 import { toast } from "react-toastify";
 import type {
   PeerLearningSession,
@@ -154,10 +154,10 @@ export default function PeerLearningSessionPage() {
 
   const fetchMessages = async () => {
     try {
-      const response = await axiosClient.get<PeerSessionMessage[]>(
-        `/peer-learning/sessions/${sessionId}/messages`
+      // Messages are paginated oldest-first; follow the cursor header to the end
+      setMessages(
+        await fetchAllPages<PeerSessionMessage>(`/peer-learning/sessions/${sessionId}/messages`, { limit: 100 })
       );
-      setMessages(response.data);
     } catch (error: any) {
       console.error("Failed to load messages:", error);
     }
@@ -19,7 +19,7 @@ import {
   SelectValue,
 } from "@/components/ui/select";
 import { Plus, BookOpen, Clock, BarChart, Trash2, Eye } from "lucide-react";
-import { axiosClient } from "@/helper/axiosClient";
+import { axiosClient, fetchAllPages } from "@/helper/axiosClient";
 import { toast } from "react-toastify";
 import type { TeachSession, CreateTeachSessionRequest } from "@/types/teachSession";
 import type { NoteState } from "@/types/note";
@@ -47,8 +47,7 @@ export default function TeachToLearnHome() {
 
   const fetchSessions = async () => {
     try {
-      const response = await axiosClient.get<TeachSession[]>("/teach-sessions/sessions");
-      setSessions(response.data);
+      setSessions(await fetchAllPages<TeachSession>("/teach-sessions/sessions"));
     } catch (error) {
       console.error("Failed to fetch sessions:", error);
     }
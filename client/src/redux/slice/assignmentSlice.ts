@@ -1,4 +1,4 @@
-import { axiosClient } from "@/helper/axiosClient";
+import { axiosClient, fetchAllPages } from "@/helper/axiosClient";
 import type { IAssignment } from "@/types/assignment";
 import { createSlice, createAsyncThunk } from "@reduxjs/toolkit";
 import type { PayloadAction } from "@reduxjs/toolkit";
@@ -8,8 +8,7 @@ export const fetchAssignments = createAsyncThunk(
   "assignments/fetchAll",
   async (_, thunkApi) => {
     try {
-      const response = await axiosClient.get("/assignments/assignments");
-      return response.data;
+      return await fetchAllPages<IAssignment>("/assignments/assignments");
     } catch (error: unknown) {
       if (error instanceof AxiosError) {
         return thunkApi.rejectWithValue(
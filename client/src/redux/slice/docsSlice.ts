@@ -1,4 +1,4 @@
-import { axiosClient } from "@/helper/axiosClient";
+import { axiosClient, fetchAllPages, fetchAllPagesOf } from "@/helper/axiosClient";
 import type { IDocs } from "@/types/doc";
 import { createSlice, createAsyncThunk } from "@reduxjs/toolkit";
 import type { PayloadAction } from "@reduxjs/toolkit";
@@ -26,8 +26,7 @@ export const DocsUpload = createAsyncThunk(
 
 export const DocsFetch = createAsyncThunk("docs/fetch", async (_, thunkApi) => {
   try {
-    const response = await axiosClient.get("/docs/my-docs");
-    return response.data;
+    return await fetchAllPages<IDocs>("/docs/my-docs");
   } catch (error) {
     if (error instanceof AxiosError) {
       return thunkApi.rejectWithValue(
@@ -57,10 +56,7 @@ export const DocsStudentFetch = createAsyncThunk(
   "docs/studentFetch",
   async (_, thunkApi) => {
     try {
-      const response = await axiosClient.get(
-        "/docs/teacher-notes-with-docs"
-      );
-      return response.data;
+      return await fetchAllPagesOf("/docs/teacher-notes-with-docs", "docsuploads");
     } catch (error) {
       if (error instanceof AxiosError) {
         return thunkApi.rejectWithValue(
@@ -1,4 +1,4 @@
-import { axiosClient } from "@/helper/axiosClient";
+import { axiosClient, fetchAllPagesOf } from "@/helper/axiosClient";
 import type { NoteState } from "@/types/note";
 import { createSlice, createAsyncThunk } from "@reduxjs/toolkit";
 import type { PayloadAction } from "@reduxjs/toolkit";
@@ -8,8 +8,7 @@ export const teacherNotes = createAsyncThunk(
   "notes/teacher-notes",
   async (_, thunkApi) => {
     try {
-      const response = await axiosClient.get("/notes/teacher-get-notes");
-      return response.data;
+      return await fetchAllPagesOf("/notes/teacher-get-notes", "notes");
     } catch (error: unknown) {
       if (error instanceof AxiosError) {
         return thunkApi.rejectWithValue(
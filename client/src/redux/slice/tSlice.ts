@@ -1,4 +1,4 @@
-import { axiosClient } from "@/helper/axiosClient";
+import { axiosClient, fetchAllPages } from "@/helper/axiosClient";
 import type { TViewAllState } from "@/types/teacher";
 import { createSlice, createAsyncThunk } from "@reduxjs/toolkit";
 import type { PayloadAction } from "@reduxjs/toolkit";
@@ -8,8 +8,7 @@ export const viewAllTeacher = createAsyncThunk(
   "teacher/viewAll",
   async (_, thunkApi) => {
     try {
-      const response = await axiosClient.get("/insights/teacher-insights");
-      return response.data;
+      return await fetchAllPages("/insights/teacher-insights");
     } catch (error: unknown) {
       if (error instanceof AxiosError) {
         return thunkApi.rejectWithValue(
@@ -1,7 +1,9 @@
 export interface NoteState {
   id: string;
   title: string;
-  content: string;
+  content?: string; // Only on GET /notes/{id}; lists return excerpt and size
+  excerpt?: string;
+  size?: number;
   created_at: string;
   updated_at: string;
   owner_id: string;
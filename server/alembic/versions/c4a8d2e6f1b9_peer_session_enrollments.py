@@ -0,0 +1,93 @@
+"""peer_session_enrollments
+
+Revision ID: c4a8d2e6f1b9
+Revises: b7e2c91d4f3a
+Create Date: 2026-10-17 11:03:27.640192
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a8d2e6f1b9'
+down_revision: Union[str, Sequence[str], None] = 'b7e2c91d4f3a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+sessions = sa.table(
+    'peer_learning_sessions',
+    sa.column('id', sa.String),
+    sa.column('created_at', sa.DateTime),
+    sa.column('enrolled_student_ids', sa.JSON),
+    sa.column('enrolled_count', sa.Integer),
+)
+enrollments = sa.table(
+    'peer_session_enrollments',
+    sa.column('peer_session_id', sa.String),
+    sa.column('student_id', sa.String),
+    sa.column('enrolled_at', sa.DateTime),
+)
+users = sa.table('users', sa.column('id', sa.String))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'peer_session_enrollments',
+        sa.Column('peer_session_id', sa.String(), nullable=False),
+        sa.Column('student_id', sa.String(), nullable=False),
+        sa.Column('enrolled_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['peer_session_id'], ['peer_learning_sessions.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['student_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('peer_session_id', 'student_id'),
+    )
+    op.create_index('ix_peer_session_enrollments_student_id', 'peer_session_enrollments', ['student_id'])
+    op.add_column(
+        'peer_learning_sessions',
+        sa.Column('enrolled_count', sa.Integer(), server_default='0', nullable=False),
+    )
+
+    # Move the JSON id lists into rows, skipping duplicates and deleted users
+    bind = op.get_bind()
+    known_users = {row.id for row in bind.execute(sa.select(users.c.id))}
+    rows = []
+    for session in bind.execute(sa.select(sessions.c.id, sessions.c.created_at, sessions.c.enrolled_student_ids)):
+        student_ids = [sid for sid in dict.fromkeys(session.enrolled_student_ids or []) if sid in known_users]
+        rows.extend(
+            {'peer_session_id': session.id, 'student_id': sid, 'enrolled_at': session.created_at}
+            for sid in student_ids
+        )
+        if student_ids:
+            bind.execute(
+                sessions.update()
+                .where(sessions.c.id == session.id)
+                .values(enrolled_count=len(student_ids))
+            )
+    if rows:
+        op.bulk_insert(enrollments, rows)
+
+    op.drop_column('peer_learning_sessions', 'enrolled_student_ids')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('peer_learning_sessions', sa.Column('enrolled_student_ids', sa.JSON(), nullable=True))
+
+    bind = op.get_bind()
+    student_ids = {}
+    for row in bind.execute(
+        sa.select(enrollments.c.peer_session_id, enrollments.c.student_id).order_by(enrollments.c.enrolled_at)
+    ):
+        student_ids.setdefault(row.peer_session_id, []).append(row.student_id)
+    for session_id, ids in student_ids.items():
+        bind.execute(
+            sessions.update().where(sessions.c.id == session_id).values(enrolled_student_ids=ids)
+        )
+
+    op.drop_column('peer_learning_sessions', 'enrolled_count')
+    op.drop_index('ix_peer_session_enrollments_student_id', table_name='peer_session_enrollments')
+    op.drop_table('peer_session_enrollments')
@@ -0,0 +1,56 @@
+"""add_list_ordering_indexes
+
+Revision ID: d9f3b5a7c2e8
+Revises: c4a8d2e6f1b9
+Create Date: 2026-10-17 12:20:08.514737
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9f3b5a7c2e8'
+down_revision: Union[str, Sequence[str], None] = 'c4a8d2e6f1b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns) matching each list route's keyset ORDER BY
+INDEXES = [
+    ('ix_notes_group_id_created_at_id', 'notes', ['group_id', 'created_at', 'id']),
+    ('ix_notes_owner_id_created_at_id', 'notes', ['owner_id', 'created_at', 'id']),
+    ('ix_docsuploads_owner_id_updated_at_id', 'docsuploads', ['owner_id', 'updated_at', 'id']),
+    ('ix_assignments_owner_id_created_at_id', 'assignments', ['owner_id', 'created_at', 'id']),
+    ('ix_teacher_insights_created_at_id', 'teacher_insights', ['created_at', 'id']),
+    ('ix_teacher_insights_user_id_created_at_id', 'teacher_insights', ['user_id', 'created_at', 'id']),
+    ('ix_teach_sessions_student_id_created_at_id', 'teach_sessions', ['student_id', 'created_at', 'id']),
+    ('ix_interviewpreps_user_id_created_at_id', 'interviewpreps', ['user_id', 'created_at', 'id']),
+    (
+        'ix_peer_learning_sessions_teacher_user_id_created_at_id',
+        'peer_learning_sessions',
+        ['teacher_user_id', 'created_at', 'id'],
+    ),
+]
+
+# Superseded by ix_notes_group_id_created_at_id, which has group_id as its prefix
+OLD_NOTES_GROUP_INDEX = 'ix_notes_group_id'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index(OLD_NOTES_GROUP_INDEX, table_name='notes', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(OLD_NOTES_GROUP_INDEX, 'notes', ['group_id'], postgresql_concurrently=True, if_not_exists=True)
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -5,4 +5,12 @@ load_dotenv()
 
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
 
-ACCESS_TOKEN_EXPIRE_DAYS = 15
\ No newline at end of file
+ACCESS_TOKEN_EXPIRE_DAYS = 15
+
+# bcrypt cost factor for new hashes; existing hashes keep the cost they were created with
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS") or 12)
+
+# Dedicated threads for password hashing (bcrypt releases the GIL) and how many
+# requests may wait for them before new ones are rejected with 503
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS") or min(4, os.cpu_count() or 1))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE") or 64)
@@ -1,21 +1,154 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from fastapi import Request, Response
 from dotenv import load_dotenv
+from app.config.metrics import PoolMetrics, TimedQueuePool, TimedAsyncAdaptedQueuePool
 import os
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Pool settings (per engine, per worker). Each worker holds one sync and one
+# async pool, so the worst case per worker is 2 * (size + overflow) connections.
+DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 5)
+DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 10)
+DB_POOL_TIMEOUT = _env_int("DB_POOL_TIMEOUT", 30)
+DB_POOL_RECYCLE = _env_int("DB_POOL_RECYCLE", 1800)
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+
+_pool_kwargs = dict(
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
+
+# After a write, the user's reads stay on the primary for this many seconds
+# so they see their own changes despite replica lag.
+READ_YOUR_WRITES_SECONDS = _env_int("READ_YOUR_WRITES_SECONDS", 5)
+PRIMARY_STICKY_COOKIE = "db_primary"
+
+
+def _async_url_and_args(url: str):
+    """Translate the sync Postgres URL into an asyncpg URL plus connect args.
+
+    asyncpg does not understand libpq query options such as ``sslmode`` or
+    ``channel_binding`` (NeonDB URLs carry both), so they are stripped and
+    mapped onto asyncpg's ``ssl`` argument instead.
+    """
+    parsed = make_url(url)
+    query = dict(parsed.query)
+    sslmode = query.pop("sslmode", None)
+    query.pop("channel_binding", None)
+
+    connect_args = {}
+    if sslmode in ("require", "verify-ca", "verify-full"):
+        connect_args["ssl"] = "require" if sslmode == "require" else True
+
+    parsed = parsed.set(drivername="postgresql+asyncpg", query=query)
+    return parsed.render_as_string(hide_password=False), connect_args
+
 
 # Create sync engine
-engine = create_engine(DATABASE_URL, echo=False, future=True)
+engine = create_engine(DATABASE_URL, echo=False, future=True, poolclass=TimedQueuePool, **_pool_kwargs)
+engine.pool.metrics = PoolMetrics("primary")
 
 # Create session
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Create async engine (asyncpg) for `async def` routes
+ASYNC_DATABASE_URL, _async_connect_args = _async_url_and_args(
+    os.getenv("ASYNC_DATABASE_URL") or DATABASE_URL
+)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=False,
+    connect_args=_async_connect_args,
+    poolclass=TimedAsyncAdaptedQueuePool,
+    **_pool_kwargs,
+)
+async_engine.sync_engine.pool.metrics = PoolMetrics("primary_async")
+
+# Read replica engines; without DATABASE_REPLICA_URL reads go to the primary
+if DATABASE_REPLICA_URL:
+    replica_engine = create_engine(
+        DATABASE_REPLICA_URL, echo=False, future=True, poolclass=TimedQueuePool, **_pool_kwargs
+    )
+    replica_engine.pool.metrics = PoolMetrics("replica")
+
+    ASYNC_DATABASE_REPLICA_URL, _async_replica_connect_args = _async_url_and_args(DATABASE_REPLICA_URL)
+    async_replica_engine = create_async_engine(
+        ASYNC_DATABASE_REPLICA_URL,
+        echo=False,
+        connect_args=_async_replica_connect_args,
+        poolclass=TimedAsyncAdaptedQueuePool,
+        **_pool_kwargs,
+    )
+    async_replica_engine.sync_engine.pool.metrics = PoolMetrics("replica_async")
+else:
+    replica_engine = engine
+    async_replica_engine = async_engine
+
+# Create async session. Objects stay usable after commit so handlers can
+# build their responses without another round-trip.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+# Read-only sessions bound to the replica
+ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+AsyncReplicaSessionLocal = async_sessionmaker(
+    bind=async_replica_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 # Base for models
 Base = declarative_base()
 
+
+def pool_stats() -> list:
+    """Snapshot of every engine pool, for the metrics endpoint."""
+    pools = [engine.pool, async_engine.sync_engine.pool]
+    if DATABASE_REPLICA_URL:
+        pools += [replica_engine.pool, async_replica_engine.sync_engine.pool]
+    return [pool.metrics.snapshot(pool) for pool in pools]
+
+
+def mark_primary_sticky(response: Response):
+    """Pin the client's reads to the primary for READ_YOUR_WRITES_SECONDS.
+
+    A cookie keeps this consistent across workers without shared state.
+    """
+    response.set_cookie(
+        key=PRIMARY_STICKY_COOKIE,
+        value="1",
+        max_age=READ_YOUR_WRITES_SECONDS,
+        httponly=True,
+        samesite="lax",
+    )
+
+
+def _reads_from_primary(request: Request) -> bool:
+    return not DATABASE_REPLICA_URL or PRIMARY_STICKY_COOKIE in request.cookies
+
+
 # Dependency for FastAPI routes
 def get_db():
     db = SessionLocal()
@@ -23,3 +156,24 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Dependency for async FastAPI routes
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Dependencies for read-only routes: replica unless the client wrote recently
+def get_read_db(request: Request):
+    db = SessionLocal() if _reads_from_primary(request) else ReplicaSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request):
+    factory = AsyncSessionLocal if _reads_from_primary(request) else AsyncReplicaSessionLocal
+    async with factory() as db:
+        yield db
@@ -0,0 +1,167 @@
+import atexit
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+import orjson
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LOG_LEVEL = (os.getenv("LOG_LEVEL") or "INFO").upper()
+# "json" for one structured object per line, "text" for local development
+LOG_FORMAT = (os.getenv("LOG_FORMAT") or "json").lower()
+# Records waiting for the writer thread; beyond this they are dropped rather than block requests
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE") or 10000)
+
+# Per-subsystem levels, "logger=LEVEL,..."; noisy third-party loggers default to WARNING
+DEFAULT_LOG_LEVELS = "socketio=WARNING,engineio=WARNING,sqlalchemy.engine=WARNING,httpx=WARNING,httpcore=WARNING"
+LOG_LEVELS = os.getenv("LOG_LEVELS") or DEFAULT_LOG_LEVELS
+# Sampling for hot-path loggers, "logger=rate,...": only that fraction of
+# records below WARNING is kept, e.g. "uvicorn.access=0.1,app.router.websocket=0.05"
+LOG_SAMPLE = os.getenv("LOG_SAMPLE") or ""
+
+# Attributes every LogRecord has; anything else was passed via ``extra=``
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+
+def _parse_pairs(spec: str) -> dict:
+    pairs = {}
+    for item in spec.split(","):
+        name, sep, value = item.partition("=")
+        if sep and name.strip():
+            pairs[name.strip()] = value.strip()
+    return pairs
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message plus any ``extra`` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of sub-WARNING records from the configured hot-path loggers.
+
+    Rates are matched by logger-name prefix, so "app.router" covers every router.
+    """
+
+    def __init__(self, rates: dict):
+        super().__init__()
+        self.rates = rates
+        self._resolved = {}
+
+    def _rate(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            # Longest configured prefix wins
+            for prefix in sorted(self.rates, key=len, reverse=True):
+                if name == prefix or name.startswith(prefix + "."):
+                    rate = self.rates[prefix]
+                    break
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records when the writer falls behind instead of blocking"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener = None
+_queue_handler = None
+_setup_lock = threading.Lock()
+
+
+def setup_logging():
+    """Route all logging through a background writer thread.
+
+    Request code only formats the message and enqueues it; the stream write
+    happens on the listener thread. Safe to call more than once.
+    """
+    global _listener, _queue_handler
+    with _setup_lock:
+        if _listener:
+            return
+
+        stream_handler = logging.StreamHandler(sys.stdout)
+        if LOG_FORMAT == "text":
+            stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        else:
+            stream_handler.setFormatter(JsonFormatter())
+
+        log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        _queue_handler = DroppingQueueHandler(log_queue)
+        sampling = {name: float(rate) for name, rate in _parse_pairs(LOG_SAMPLE).items()}
+        if sampling:
+            _queue_handler.addFilter(SamplingFilter(sampling))
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_queue_handler)
+        root.setLevel(LOG_LEVEL)
+
+        # uvicorn installs its own synchronous handlers before importing the app
+        for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+            uvicorn_logger = logging.getLogger(name)
+            uvicorn_logger.handlers.clear()
+            uvicorn_logger.propagate = True
+
+        for name, level in _parse_pairs(LOG_LEVELS).items():
+            logging.getLogger(name).setLevel(level.upper())
+
+        _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    with _setup_lock:
+        if _listener:
+            _listener.stop()
+            _listener = None
+
+
+def logging_stats() -> dict:
+    return {
+        "queued": _queue_handler.queue.qsize() if _queue_handler else 0,
+        "dropped": _queue_handler.dropped if _queue_handler else 0,
+    }
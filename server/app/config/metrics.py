@@ -0,0 +1,217 @@
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+
+# Upper bounds (ms) of the wait-time histogram buckets; anything slower lands in "+Inf"
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """Thread-safe fixed-bucket histogram."""
+
+    def __init__(self, buckets=WAIT_BUCKETS_MS):
+        self._buckets = tuple(buckets)
+        self._counts = [0] * (len(self._buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = len(self._buckets)
+        for i, bound in enumerate(self._buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        labels = [f"le_{bound}" for bound in self._buckets] + ["+Inf"]
+        return {
+            "buckets": dict(zip(labels, counts)),
+            "count": count,
+            "sum": round(total, 3),
+            "avg": round(total / count, 3) if count else 0.0,
+        }
+
+
+class PoolMetrics:
+    """Counters for a single connection pool (checkout waits, timeouts, connects)."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.wait_ms = Histogram()
+        self.timeouts = 0
+        self.connects = 0
+        self.checkouts = 0
+        self._lock = threading.Lock()
+
+    def record_checkout(self, waited_ms: float, timed_out: bool = False):
+        self.wait_ms.observe(waited_ms)
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def snapshot(self, pool) -> dict:
+        return {
+            "name": self.name,
+            "pool_size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "connects": self.connects,
+            "wait_ms": self.wait_ms.snapshot(),
+        }
+
+
+class _TimedPoolMixin:
+    """Times how long each checkout waits for a connection.
+
+    ``metrics`` is assigned after the engine is built and is carried over
+    when the pool is recreated (e.g. by ``engine.dispose()``).
+    """
+
+    metrics: PoolMetrics = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            if self.metrics:
+                self.metrics.record_checkout((time.perf_counter() - start) * 1000, timed_out=True)
+            raise
+        if self.metrics:
+            self.metrics.record_checkout((time.perf_counter() - start) * 1000)
+        return conn
+
+    def _create_connection(self):
+        if self.metrics:
+            self.metrics.record_connect()
+        return super()._create_connection()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+# ============== PER-REQUEST QUERY STATS ==============
+
+# The same statement shape executed this many times in one request is flagged as N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD") or 5)
+# How many finished requests the debug endpoint keeps
+RECENT_REQUESTS = int(os.getenv("QUERY_STATS_RECENT_REQUESTS") or 200)
+
+
+class QueryStats:
+    """Statements and DB time for one request.
+
+    The object lives in a ContextVar; threadpool workers get a copy of the
+    context that points at the same object, so sync routes and dependencies
+    are counted too.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, elapsed_ms: float):
+        with self._lock:
+            self.count += 1
+            self.total_ms += elapsed_ms
+            self.shapes[statement] += 1
+
+    def n_plus_one(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> list:
+        """Statement shapes repeated at least ``threshold`` times, most frequent first"""
+        with self._lock:
+            return [
+                {"statement": " ".join(statement.split()), "count": count}
+                for statement, count in self.shapes.most_common()
+                if count >= threshold
+            ]
+
+
+_current_query_stats: ContextVar = ContextVar("query_stats", default=None)
+_recent_requests = deque(maxlen=RECENT_REQUESTS)
+
+
+def start_query_stats():
+    """Begin counting statements for the current request; returns (stats, token)"""
+    stats = QueryStats()
+    return stats, _current_query_stats.set(stats)
+
+
+def finish_query_stats(token, method: str, path: str, status_code: int, stats: QueryStats) -> dict:
+    """Stop counting and remember the request for the debug endpoint"""
+    _current_query_stats.reset(token)
+    summary = {
+        "method": method,
+        "path": path,
+        "status_code": status_code,
+        "queries": stats.count,
+        "db_ms": round(stats.total_ms, 3),
+        "n_plus_one": stats.n_plus_one(),
+    }
+    _recent_requests.append(summary)
+    return summary
+
+
+def recent_query_stats() -> list:
+    """Most recent requests first"""
+    return list(reversed(_recent_requests))
+
+
+# Listening on the Engine class covers every engine, including the sync side of async engines
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_query_stats.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_query_stats.get()
+    if stats is None or not conn.info.get("query_start"):
+        return
+    elapsed_ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+    stats.record(statement, elapsed_ms)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute; drop its start time so
+    # entries don't pile up on the pooled connection
+    conn = context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
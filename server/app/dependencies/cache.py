@@ -0,0 +1,393 @@
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import asdict, is_dataclass
+from typing import Callable, Iterable, Optional, Tuple
+
+import orjson
+from dotenv import load_dotenv
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from app.config.db import DATABASE_REPLICA_URL, READ_YOUR_WRITES_SECONDS
+from app.dependencies.principal import Principal
+from app.dependencies.redis_client import cache_client, async_cache_client, raw_cache_client, async_raw_cache_client
+from app.dependencies.singleflight import (
+    acquire_lock,
+    acquire_lock_async,
+    release_lock,
+    release_lock_async,
+    run_once,
+    run_once_async,
+)
+from app.dependencies.tiered_cache import tiered_cache
+from app.utils import codec
+from app.utils.pagination import NEXT_CURSOR_HEADER
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Default lifetime of a cached response; tag invalidation normally removes it sooner
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL") or 300)
+# After expiring, an entry may still be served for this long while one request refreshes it
+RESPONSE_CACHE_STALE_TTL = int(os.getenv("RESPONSE_CACHE_STALE_TTL") or 60)
+# How long a single-flight POST result is kept for callers that were waiting on it
+SINGLE_FLIGHT_RESULT_TTL = 60
+# Tag sets outlive every entry they point to, so an entry is never orphaned from its tags
+CACHE_TAG_TTL = 24 * 60 * 60
+
+CACHE_STATUS_HEADER = "X-Cache"
+# Response headers that are part of a cached page
+CACHED_HEADERS = (NEXT_CURSOR_HEADER,)
+
+_collected_tags: ContextVar[Optional[set]] = ContextVar("cache_tags", default=None)
+
+
+def user_tag(user_id: str) -> str:
+    """Everything cached for one user; invalidate when their group memberships change"""
+    return f"user:{user_id}"
+
+
+def group_tag(kind: str, group_id: str) -> str:
+    """Cached lists that include a group's ``kind`` rows (notes, docs, assignments)"""
+    return f"{kind}:group:{group_id}"
+
+
+def owner_tag(kind: str, user_id: str) -> str:
+    """Cached lists of ``kind`` rows owned or submitted by one user"""
+    return f"{kind}:owner:{user_id}"
+
+
+def add_cache_tags(*tags: str):
+    """Attach tags discovered while a @cached route runs (e.g. the caller's group ids)"""
+    collected = _collected_tags.get()
+    if collected is not None:
+        collected.update(tags)
+
+
+def _cache_key(namespace: str, kwargs: dict) -> str:
+    # Vary on the caller and on plain parameters (ids, filters, the page); skip sessions and responses
+    parts = {}
+    for name, value in kwargs.items():
+        if isinstance(value, Principal):
+            parts[name] = value.id
+        elif isinstance(value, BaseModel):
+            parts[name] = value.model_dump(mode="json")
+        elif is_dataclass(value):
+            parts[name] = asdict(value)
+        elif value is None or isinstance(value, (str, int, float, bool)):
+            parts[name] = value
+    digest = hashlib.blake2b(json.dumps(parts, sort_keys=True, default=str).encode(), digest_size=16).hexdigest()
+    return f"cache:{namespace}:{digest}"
+
+
+def _tag_key(tag: str) -> str:
+    return f"cachetag:{tag}"
+
+
+def _find_response(kwargs: dict) -> Optional[Response]:
+    return next((value for value in kwargs.values() if isinstance(value, Response)), None)
+
+
+# A stored entry is one line of orjson metadata (headers, freshness) followed by the
+# response body exactly as it is sent, compressed together when large. orjson never
+# emits a raw newline, so the first one ends the metadata.
+Entry = Tuple[dict, bytes]
+
+
+def _pack_entry(meta: dict, body: bytes) -> bytes:
+    return codec.compress(orjson.dumps(meta) + b"\n" + body)
+
+
+def _unpack_entry(raw: bytes) -> Optional[Entry]:
+    meta, separator, body = codec.decompress(raw).partition(b"\n")
+    if not separator:
+        # Not in this format (e.g. written by an older release): treat as a miss
+        return None
+    return orjson.loads(meta), body
+
+
+def _usable_entry(raw: Optional[bytes], kwargs: dict) -> Optional[Entry]:
+    """The stored entry, or None if it is unreadable or older than the route's validators.
+
+    A validator dependency (see utils.conditional) has already put a fresh ETag
+    on the injected response. An entry stored under a different ETag holds rows
+    from before the last change, e.g. one filled from a lagging replica, so it is
+    recomputed rather than sent under a validator that doesn't describe it.
+    """
+    entry = _unpack_entry(raw) if raw else None
+    if entry is None:
+        return None
+    response = _find_response(kwargs)
+    etag = response.headers.get("etag") if response else None
+    stored_etag = entry[0].get("etag")
+    if etag and stored_etag and stored_etag != etag:
+        return None
+    return entry
+
+
+def _respond(entry: Entry, cache_status: str, kwargs: dict) -> Response:
+    meta, body = entry
+    # Returning a Response bypasses FastAPI's merge of the injected response's headers
+    # (ETag and friends set by dependencies), so carry them over here
+    response = _find_response(kwargs)
+    headers = {name: value for name, value in response.headers.items() if name != "content-length"} if response else {}
+    # The body is already JSON: send it as is, without parsing or validating it again
+    return Response(
+        body, media_type="application/json", headers={**headers, **meta["headers"], CACHE_STATUS_HEADER: cache_status}
+    )
+
+
+def _encoder(namespace: str, response_model):
+    adapter = TypeAdapter(response_model) if response_model is not None else None
+
+    def encode(result, kwargs: dict, **extra) -> Optional[bytes]:
+        """Serialize a route result the way FastAPI would, plus the headers worth replaying"""
+        try:
+            if adapter is not None:
+                body = adapter.dump_json(adapter.validate_python(result, from_attributes=True), by_alias=True)
+            else:
+                body = orjson.dumps(jsonable_encoder(result))
+        except (ValidationError, ValueError, TypeError) as e:
+            logger.warning(f"Not caching {namespace}: {e}")
+            return None
+        response = _find_response(kwargs)
+        headers = {}
+        if response is not None:
+            headers = {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+            if "etag" in response.headers:
+                extra["etag"] = response.headers["etag"]
+            response.headers[CACHE_STATUS_HEADER] = "MISS"
+        return _pack_entry({"headers": headers, **extra}, body)
+
+    return encode
+
+
+def cached(
+    namespace: str,
+    response_model=None,
+    tags: Optional[Callable[[dict], Iterable[str]]] = None,
+    ttl: int = RESPONSE_CACHE_TTL,
+    stale_ttl: int = RESPONSE_CACHE_STALE_TTL,
+):
+    """Cache a read route's response per caller and parameters, tagged for invalidation.
+
+    Place below the ``@router.get`` decorator. ``tags`` receives the route's
+    keyword arguments and returns the tags known up front; the route can add
+    more with ``add_cache_tags``. Writes call ``invalidate_tags`` (or
+    ``invalidate_tags_async``) after committing. A hit returns the stored JSON
+    directly; a miss runs the route and stores its serialized result. Errors
+    raised by the route are never cached.
+
+    Concurrent misses for the same key are computed once (see singleflight).
+    For ``stale_ttl`` seconds after ``ttl`` the old entry is still served while
+    a single request recomputes it; invalidated entries are never served stale.
+
+    An invalidation that lands while a miss is being computed can leave that one
+    entry stale until ``ttl`` expires.
+
+    On routes with a validator dependency (``check_not_modified``) the entry
+    keeps the ETag it was computed under and is only served while the current
+    ETag is the same. The validator query therefore runs on every request, hits
+    included; only the list query and serialization are saved.
+    """
+    encode = _encoder(namespace, response_model)
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            async def compute(key, args, kwargs):
+                token = _collected_tags.set(set(tags(kwargs)) if tags else set())
+                try:
+                    result = await func(*args, **kwargs)
+                    entry_tags = _collected_tags.get()
+                finally:
+                    _collected_tags.reset(token)
+
+                entry = encode(result, kwargs, fresh_until=time.time() + ttl)
+                if entry is not None:
+                    await tiered_cache.aset(key, entry, ex=ttl + stale_ttl)
+                    for tag in entry_tags:
+                        await async_cache_client.sadd(_tag_key(tag), key)
+                        await async_cache_client.expire(_tag_key(tag), CACHE_TAG_TTL)
+                return result
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                key = _cache_key(namespace, kwargs)
+                entry = _usable_entry(await tiered_cache.aget(key), kwargs)
+                if entry:
+                    if entry[0]["fresh_until"] > time.time():
+                        return _respond(entry, "HIT", kwargs)
+                    # Expired: one request refreshes it, the rest keep getting the old copy meanwhile
+                    lock = await acquire_lock_async(key)
+                    if lock is None:
+                        return _respond(entry, "STALE", kwargs)
+                    try:
+                        return await compute(key, args, kwargs)
+                    finally:
+                        await release_lock_async(key, lock)
+
+                ran, value = await run_once_async(
+                    key, lambda: compute(key, args, kwargs), lambda: tiered_cache.aget(key)
+                )
+                if ran:
+                    return value
+                # An entry we can't read (e.g. an older format) or that is behind the validators is recomputed
+                entry = _usable_entry(value, kwargs)
+                return _respond(entry, "HIT", kwargs) if entry else await compute(key, args, kwargs)
+
+            return async_wrapper
+
+        def compute_sync(key, args, kwargs):
+            token = _collected_tags.set(set(tags(kwargs)) if tags else set())
+            try:
+                result = func(*args, **kwargs)
+                entry_tags = _collected_tags.get()
+            finally:
+                _collected_tags.reset(token)
+
+            entry = encode(result, kwargs, fresh_until=time.time() + ttl)
+            if entry is not None:
+                tiered_cache.set(key, entry, ex=ttl + stale_ttl)
+                for tag in entry_tags:
+                    cache_client.sadd(_tag_key(tag), key)
+                    cache_client.expire(_tag_key(tag), CACHE_TAG_TTL)
+            return result
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = _cache_key(namespace, kwargs)
+            entry = _usable_entry(tiered_cache.get(key), kwargs)
+            if entry:
+                if entry[0]["fresh_until"] > time.time():
+                    return _respond(entry, "HIT", kwargs)
+                lock = acquire_lock(key)
+                if lock is None:
+                    return _respond(entry, "STALE", kwargs)
+                try:
+                    return compute_sync(key, args, kwargs)
+                finally:
+                    release_lock(key, lock)
+
+            ran, value = run_once(key, lambda: compute_sync(key, args, kwargs), lambda: tiered_cache.get(key))
+            if ran:
+                return value
+            entry = _usable_entry(value, kwargs)
+            return _respond(entry, "HIT", kwargs) if entry else compute_sync(key, args, kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def single_flight(namespace: str, response_model=None):
+    """Collapse concurrent identical calls of an expensive route (e.g. an LLM call) into one.
+
+    Callers with the same user and parameters that arrive while one is running
+    wait for it and receive its response instead of repeating the work. Nothing
+    is cached beyond that: a later identical call runs again.
+    """
+    encode = _encoder(namespace, response_model)
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                key = _cache_key(f"flight:{namespace}", kwargs)
+
+                async def compute():
+                    # Drop an earlier call's result so waiters only ever see this one
+                    await async_raw_cache_client.delete(key)
+                    result = await func(*args, **kwargs)
+                    entry = encode(result, kwargs)
+                    if entry is not None:
+                        await async_raw_cache_client.set(key, entry, ex=SINGLE_FLIGHT_RESULT_TTL)
+                    return result
+
+                ran, value = await run_once_async(key, compute, lambda: async_raw_cache_client.get(key))
+                if ran:
+                    return value
+                entry = _unpack_entry(value)
+                return _respond(entry, "SHARED", kwargs) if entry else await compute()
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = _cache_key(f"flight:{namespace}", kwargs)
+
+            def compute():
+                # Drop an earlier call's result so waiters only ever see this one
+                raw_cache_client.delete(key)
+                result = func(*args, **kwargs)
+                entry = encode(result, kwargs)
+                if entry is not None:
+                    raw_cache_client.set(key, entry, ex=SINGLE_FLIGHT_RESULT_TTL)
+                return result
+
+            ran, value = run_once(key, compute, lambda: raw_cache_client.get(key))
+            if ran:
+                return value
+            entry = _unpack_entry(value)
+            return _respond(entry, "SHARED", kwargs) if entry else compute()
+
+        return wrapper
+
+    return decorator
+
+
+def _drop_tags(*tags: str):
+    keys = set()
+    for tag in tags:
+        keys |= cache_client.smembers(_tag_key(tag))
+    cache_client.delete(*(_tag_key(tag) for tag in tags))
+    tiered_cache.delete(*keys)
+
+
+def _drop_tags_again_later(tags):
+    # A miss right after the write may have read a lagging replica and cached pre-write
+    # rows. Drop the tags once more after the same lag bound the sticky cookie assumes.
+    if not DATABASE_REPLICA_URL:
+        return
+    timer = threading.Timer(READ_YOUR_WRITES_SECONDS, _drop_tags_safely, args=tags)
+    timer.daemon = True
+    timer.start()
+
+
+def _drop_tags_safely(*tags: str):
+    try:
+        _drop_tags(*tags)
+    except Exception as e:
+        logger.warning(f"Delayed cache invalidation failed: {e}")
+
+
+def invalidate_tags(*tags: str):
+    """Drop every cached response carrying any of ``tags``, on all workers; call after the write commits.
+
+    With a read replica the tags are dropped again READ_YOUR_WRITES_SECONDS later,
+    so an entry refilled from a replica that had not yet seen the write doesn't
+    outlive the lag.
+    """
+    if not tags:
+        return
+    _drop_tags(*tags)
+    _drop_tags_again_later(tags)
+
+
+async def invalidate_tags_async(*tags: str):
+    if not tags:
+        return
+    keys = set()
+    for tag in tags:
+        keys |= await async_cache_client.smembers(_tag_key(tag))
+    await async_cache_client.delete(*(_tag_key(tag) for tag in tags))
+    await tiered_cache.adelete(*keys)
+    _drop_tags_again_later(tags)
@@ -1,56 +1,70 @@
 from fastapi import Depends, HTTPException, Request
 from sqlalchemy.orm import Session
-from app.config.db import get_db
+from app.config.db import get_db, get_async_db, get_read_db, get_async_read_db
 from app.models.auth import User
+from app.dependencies.principal import Principal, get_cached_principal, cache_principal
+from app.dependencies.revocation import is_token_revoked
 from app.utils.utils import decode_access_token
 import logging
 
 logger = logging.getLogger(__name__)
 
-def get_current_user(request: Request, db: Session = Depends(get_db)):
-    logger.info("=== get_current_user called ===")
-    logger.info(f"Request URL: {request.url}")
-    logger.info(f"Request headers: {dict(request.headers)}")
-    logger.info(f"Cookies: {request.cookies}")
-    
+def get_request_token(request: Request):
     # Try to get token from cookie first (for same-origin requests)
     token = request.cookies.get("access_token")
-    
+
     # If not in cookie, try Authorization header (for cross-origin/mobile requests)
     if not token:
         auth_header = request.headers.get("authorization")
         if auth_header and auth_header.startswith("Bearer "):
             token = auth_header.replace("Bearer ", "")
-            logger.info(f"Token from Authorization header: {token[:20] if token else 'None'}...")
-        else:
-            logger.info("No Authorization header or invalid format")
-    else:
-        logger.info(f"Token from cookie: {token[:20] if token else 'None'}...")
-    
+    return token
+
+
+def get_current_user(request: Request, db: Session = Depends(get_db)) -> Principal:
+    token = get_request_token(request)
+
     if not token:
-        logger.error("No access_token found in cookie or Authorization header")
+        logger.debug("No access token in cookie or Authorization header", extra={"path": request.url.path})
         raise HTTPException(status_code=401, detail="Not authenticated")
-    
+
     try:
         payload = decode_access_token(token)
-        logger.info(f"Decoded payload: {payload}")
-        
+
         email = payload.get("sub")
         if not email:
             logger.error("No email in token payload")
             raise HTTPException(status_code=401, detail="Invalid token")
-        
-        logger.info(f"Looking up user with email: {email}")
-        user = db.query(User).filter(User.email == email).first()
-        
+
+        # Tokens issued before revocation support have no jti and simply run to expiry
+        jti = payload.get("jti")
+        if jti and is_token_revoked(jti):
+            raise HTTPException(status_code=401, detail="Token has been revoked")
+
+        # Most requests are served from the principal cache without a DB round-trip
+        principal = get_cached_principal(email)
+        if principal:
+            return principal
+
+        # Newer tokens carry the user id, so a miss is a primary-key lookup
+        user_id = payload.get("uid")
+        if user_id:
+            user = db.get(User, user_id)
+            if user and user.email != email:
+                user = None
+        else:
+            user = db.query(User).filter(User.email == email).first()
+
         if not user:
             logger.error(f"User not found for email: {email}")
             raise HTTPException(status_code=401, detail="User not found")
-        
-        logger.info(f"✅ User authenticated successfully: {user.email}")
-        return user
+
+        principal = Principal.from_user(user)
+        cache_principal(email, principal)
+        logger.debug(f"User authenticated from database: {user.email}")
+        return principal
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Exception in get_current_user: {e}")
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
\ No newline at end of file
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
@@ -0,0 +1,67 @@
+import os
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from app.dependencies.tiered_cache import tiered_cache
+from app.models.auth import User, userRole
+from app.utils import codec
+
+load_dotenv()
+
+# Lifetime of a cached principal; invalidate_principal clears it on every worker sooner
+PRINCIPAL_CACHE_TTL = int(os.getenv("PRINCIPAL_CACHE_TTL") or 300)
+
+
+@dataclass
+class Principal:
+    """Snapshot of the authenticated user's columns.
+
+    Returned by get_current_user in place of an ORM User, so it carries no
+    session and no relationships; query by ``id`` when a route needs more.
+    """
+    id: str
+    email: str
+    full_name: Optional[str]
+    role: userRole
+    image_url: Optional[str] = None
+    coins: int = 0
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            role=userRole(user.role),
+            image_url=user.image_url,
+            coins=user.coins or 0,
+        )
+
+
+def _redis_key(subject: str) -> str:
+    return f"principal:{subject}"
+
+
+def get_cached_principal(subject: str) -> Optional[Principal]:
+    """Look up a principal by token subject: in-process L1 first, then Redis"""
+    raw = tiered_cache.get(_redis_key(subject))
+    if not raw:
+        return None
+
+    data = codec.loads(raw)
+    return Principal(**{**data, "role": userRole(data["role"])})
+
+
+def cache_principal(subject: str, principal: Principal):
+    tiered_cache.set(
+        _redis_key(subject),
+        codec.dumps({**asdict(principal), "role": principal.role.value}),
+        ex=PRINCIPAL_CACHE_TTL,
+    )
+
+
+def invalidate_principal(subject: str):
+    """Drop a cached principal; call after changing a user's profile, coins or role"""
+    tiered_cache.delete(_redis_key(subject))
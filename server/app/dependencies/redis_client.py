@@ -1,52 +1,457 @@
 import redis
+import redis.asyncio as aioredis
+from redis import RedisError
 from dotenv import load_dotenv
+from collections import OrderedDict
+import logging
 import os
+import threading
+import time
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Connection pool shared by every caller in the worker
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS") or 50)
+# Short timeouts so a sick Redis fails fast instead of stalling requests
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT") or 0.5)
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT") or 1.0)
+# Background ping interval, failures before the breaker opens, and how long it stays open
+REDIS_HEALTH_INTERVAL = float(os.getenv("REDIS_HEALTH_INTERVAL") or 5)
+REDIS_BREAKER_THRESHOLD = int(os.getenv("REDIS_BREAKER_THRESHOLD") or 3)
+REDIS_BREAKER_COOLDOWN = float(os.getenv("REDIS_BREAKER_COOLDOWN") or 30)
+
+pool_options = dict(
+    max_connections=REDIS_MAX_CONNECTIONS,
+    socket_timeout=REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+    health_check_interval=30,
+    decode_responses=True,
+)
+
 # Prefer a single REDIS_URL if provided, otherwise fall back to discrete fields
 redis_url = os.getenv("REDIS_URL")
 
-if redis_url:
-    redis_client = redis.from_url(redis_url, decode_responses=True)
-else:
+if not redis_url:
     host = os.getenv("REDIS_HOST")
     port_env = os.getenv("REDIS_PORT")
     username = os.getenv("REDIS_USER")
     password = os.getenv("REDIS_PASSWORD")
 
-    port = int(port_env) if port_env else None
+    port = int(port_env) if port_env else 6379
+
+    server_options = dict(host=host or "localhost", port=port, username=username, password=password)
+
+
+def _make_pool(pool_class, **overrides):
+    options = {**pool_options, **overrides}
+    if redis_url:
+        return pool_class.from_url(redis_url, **options)
+    return pool_class(**server_options, **options)
+
+
+redis_pool = _make_pool(redis.ConnectionPool)
+async_redis_pool = _make_pool(aioredis.ConnectionPool)
+# Cached values are codec bytes (see app.utils.codec), which must not be decoded as text
+raw_redis_pool = _make_pool(redis.ConnectionPool, decode_responses=False)
+async_raw_redis_pool = _make_pool(aioredis.ConnectionPool, decode_responses=False)
+
+# Sync client for threadpool (def) routes and background threads
+redis_client = redis.Redis(connection_pool=redis_pool)
+# Async client for async def routes, so cache calls don't block the event loop
+async_redis_client = aioredis.Redis(connection_pool=async_redis_pool)
+raw_redis_client = redis.Redis(connection_pool=raw_redis_pool)
+async_raw_redis_client = aioredis.Redis(connection_pool=async_raw_redis_pool)
+
+
+# Entries kept by the in-process fallback cache before the least recently used is evicted
+LOCAL_CACHE_MAXSIZE = int(os.getenv("LOCAL_CACHE_MAXSIZE") or 1024)
 
-    redis_client = redis.Redis(
-        host=host,
-        port=port,
-        username=username,
-        password=password,
-        decode_responses=True,
-    )
 
+class LocalCache:
+    """Thread-safe, size-bounded LRU cache with per-key TTLs.
 
-class _LocalCache:
-    def __init__(self):
-        self._store = {}
+    Mirrors the subset of the redis-py API the app uses (``get``, ``set``
+    with ``ex``/``px``/``nx``/``xx``, ``delete``, ``exists``, ``sadd``,
+    ``smembers``, ``expire``, ``ping``) so it
+    can stand in for ``redis_client`` when Redis is unreachable.
+    """
+
+    def __init__(self, maxsize: int = LOCAL_CACHE_MAXSIZE):
+        self.maxsize = maxsize
+        self._store = OrderedDict()  # key -> (value, expires_at or None)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _live(self, key, now):
+        # Caller holds the lock; drops the entry if it has expired
+        entry = self._store.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= now:
+            del self._store[key]
+            self.expirations += 1
+            return None
+        return entry
 
     def get(self, key):
-        return self._store.get(key)
+        with self._lock:
+            entry = self._live(key, time.monotonic())
+            if entry is None:
+                self.misses += 1
+                return None
+            self._store.move_to_end(key)
+            self.hits += 1
+            return entry[0]
 
-    def set(self, key, value):
-        self._store[key] = value
-        return True
+    def set(self, name, value, ex=None, px=None, nx=False, xx=False):
+        now = time.monotonic()
+        expires_at = None
+        if ex is not None:
+            expires_at = now + ex
+        elif px is not None:
+            expires_at = now + px / 1000
+
+        with self._lock:
+            exists = self._live(name, now) is not None
+            if (nx and exists) or (xx and not exists):
+                return None
+            self._store[name] = (value, expires_at)
+            self._store.move_to_end(name)
+            while len(self._store) > self.maxsize:
+                self._store.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    def delete(self, *names):
+        with self._lock:
+            return sum(self._store.pop(name, None) is not None for name in names)
+
+    def exists(self, *names):
+        with self._lock:
+            now = time.monotonic()
+            return sum(self._live(name, now) is not None for name in names)
 
-    def delete(self, key):
-        self._store.pop(key, None)
+    def sadd(self, name, *values):
+        with self._lock:
+            entry = self._live(name, time.monotonic())
+            members, expires_at = entry if entry else (set(), None)
+            added = len(set(values) - members)
+            self._store[name] = (members | set(values), expires_at)
+            self._store.move_to_end(name)
+            while len(self._store) > self.maxsize:
+                self._store.popitem(last=False)
+                self.evictions += 1
+            return added
+
+    def smembers(self, name):
+        with self._lock:
+            entry = self._live(name, time.monotonic())
+            return set(entry[0]) if entry else set()
+
+    def expire(self, name, time_seconds):
+        with self._lock:
+            entry = self._live(name, time.monotonic())
+            if entry is None:
+                return False
+            self._store[name] = (entry[0], time.monotonic() + time_seconds)
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._store.clear()
+
+    def ping(self):
         return True
 
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._store),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+# One shared fallback per process, so entries survive across requests while Redis is down
+local_cache = LocalCache()
+
+
+class CircuitBreaker:
+    """Stops calls to Redis after repeated failures.
+
+    Closed: calls go through. Open: calls are skipped until ``cooldown`` has
+    passed, then the next call is let through as a trial (half-open). Any
+    success closes the breaker again.
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self.opened = 0
+        self.short_circuited = 0
+
+    @property
+    def state(self) -> str:
+        opened_at = self._opened_at
+        if opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - opened_at >= self.cooldown else "open"
+
+    def allow(self) -> bool:
+        if self.state != "open":
+            return True
+        self.short_circuited += 1
+        return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            # A failed trial call while half-open re-opens immediately
+            if self._failures >= self.threshold or self._opened_at is not None:
+                if self._opened_at is None:
+                    self.opened += 1
+                self._opened_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "opened": self.opened,
+            "short_circuited": self.short_circuited,
+        }
+
+
+redis_breaker = CircuitBreaker(REDIS_BREAKER_THRESHOLD, REDIS_BREAKER_COOLDOWN)
+
+
+class CacheClient:
+    """Redis with the process-local cache behind a circuit breaker.
+
+    Exposes the same calls as ``LocalCache``. While the breaker is closed each
+    call is one Redis round-trip; when Redis errors or the breaker is open the
+    call is served by ``local_cache`` instead of raising.
+    """
+
+    def __init__(self, client: redis.Redis):
+        self.client = client
+
+    def _call(self, method: str, *args, **kwargs):
+        if redis_breaker.allow():
+            try:
+                result = getattr(self.client, method)(*args, **kwargs)
+                redis_breaker.record_success()
+                return result
+            except (RedisError, OSError) as e:
+                redis_breaker.record_failure()
+                logger.warning(f"Redis {method} failed, using local cache: {e}")
+        return getattr(local_cache, method)(*args, **kwargs)
+
+    def get(self, key):
+        return self._call("get", key)
+
+    def set(self, name, value, ex=None, px=None, nx=False, xx=False):
+        return self._call("set", name, value, ex=ex, px=px, nx=nx, xx=xx)
+
+    def delete(self, *names):
+        return self._call("delete", *names)
+
+    def exists(self, *names):
+        return self._call("exists", *names)
+
+    def sadd(self, name, *values):
+        return self._call("sadd", name, *values)
+
+    def smembers(self, name):
+        return self._call("smembers", name)
+
+    def expire(self, name, time_seconds):
+        return self._call("expire", name, time_seconds)
+
+
+cache_client = CacheClient(redis_client)
+# Same, for byte values: returns what was stored instead of decoding it
+raw_cache_client = CacheClient(raw_redis_client)
+
+
+class AsyncCacheClient:
+    """``CacheClient`` for async routes, backed by an asyncio Redis client.
+
+    Shares the circuit breaker and the local fallback cache with the sync client.
+    """
+
+    def __init__(self, client: aioredis.Redis):
+        self.client = client
+
+    async def _call(self, method: str, *args, **kwargs):
+        if redis_breaker.allow():
+            try:
+                result = await getattr(self.client, method)(*args, **kwargs)
+                redis_breaker.record_success()
+                return result
+            except (RedisError, OSError) as e:
+                redis_breaker.record_failure()
+                logger.warning(f"Redis {method} failed, using local cache: {e}")
+        return getattr(local_cache, method)(*args, **kwargs)
+
+    async def get(self, key):
+        return await self._call("get", key)
+
+    async def set(self, name, value, ex=None, px=None, nx=False, xx=False):
+        return await self._call("set", name, value, ex=ex, px=px, nx=nx, xx=xx)
+
+    async def delete(self, *names):
+        return await self._call("delete", *names)
+
+    async def exists(self, *names):
+        return await self._call("exists", *names)
+
+    async def sadd(self, name, *values):
+        return await self._call("sadd", name, *values)
+
+    async def smembers(self, name):
+        return await self._call("smembers", name)
+
+    async def expire(self, name, time_seconds):
+        return await self._call("expire", name, time_seconds)
+
+
+async_cache_client = AsyncCacheClient(async_redis_client)
+async_raw_cache_client = AsyncCacheClient(async_raw_redis_client)
+
+_health_stop = threading.Event()
+_health_thread = None
+
+
+def _health_loop():
+    while not _health_stop.wait(REDIS_HEALTH_INTERVAL):
+        try:
+            redis_client.ping()
+            if redis_breaker.state != "closed":
+                logger.info("Redis reachable again, closing circuit breaker")
+            redis_breaker.record_success()
+        except (RedisError, OSError) as e:
+            redis_breaker.record_failure()
+            logger.debug(f"Redis health check failed: {e}")
+
+
+def start_redis_health_check():
+    """Ping Redis in the background so the breaker state is known before requests need it"""
+    global _health_thread
+    if _health_thread and _health_thread.is_alive():
+        return
+    _health_stop.clear()
+    _health_thread = threading.Thread(target=_health_loop, name="redis-health", daemon=True)
+    _health_thread.start()
+
+
+def stop_redis_health_check():
+    _health_stop.set()
+
+
+class Subscriber:
+    """Background pub/sub listener for one channel, reconnecting with backoff.
+
+    ``on_connect`` runs right after subscribing, so anything published from then
+    on is delivered; use it to (re)load state. ``on_tick`` runs about once a
+    second and ``on_disconnect`` when the connection drops.
+    """
+
+    def __init__(self, channel: str, on_message, on_connect=None, on_disconnect=None, on_tick=None):
+        self.channel = channel
+        self.on_message = on_message
+        self.on_connect = on_connect
+        self.on_disconnect = on_disconnect
+        self.on_tick = on_tick
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        backoff = 1
+        while not self._stop.is_set():
+            pubsub = None
+            try:
+                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                if self.on_connect:
+                    self.on_connect()
+                backoff = 1
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message["type"] == "message":
+                        self.on_message(message["data"])
+                    if self.on_tick:
+                        self.on_tick()
+            except (RedisError, OSError) as e:
+                if self.on_disconnect:
+                    self.on_disconnect()
+                logger.warning(f"Subscription to {self.channel} lost, retrying in {backoff}s: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                if pubsub:
+                    try:
+                        pubsub.close()
+                    except (RedisError, OSError):
+                        pass
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"redis-sub-{self.channel}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def _pool_stats(pool) -> dict:
+    return {
+        "max_connections": pool.max_connections,
+        "in_use": len(getattr(pool, "_in_use_connections", ())),
+        "idle": len(getattr(pool, "_available_connections", ())),
+    }
+
+
+def redis_stats() -> dict:
+    return {
+        "breaker": redis_breaker.snapshot(),
+        "pool": _pool_stats(redis_pool),
+        "async_pool": _pool_stats(async_redis_pool),
+        "raw_pool": _pool_stats(raw_redis_pool),
+        "async_raw_pool": _pool_stats(async_raw_redis_pool),
+        "local_cache": local_cache.stats(),
+    }
+
 
 def get_redis_client():
-    try:
-        # Validate connectivity lazily when the dependency is requested
-        redis_client.ping()
-        return redis_client
-    except Exception:
-        # Fallback to in-memory cache so app can still function without Redis
-        return _LocalCache()
+    # No per-request ping: the breaker and health checker decide where calls go
+    return cache_client
+
+
+def get_async_redis_client():
+    """Cache dependency for async def routes; use get_redis_client in def routes"""
+    return async_cache_client
+
+
+async def close_async_redis():
+    for client in (async_redis_client, async_raw_redis_client):
+        # aclose() is redis-py >= 5.0.1; older releases in the pinned range only have close()
+        close = getattr(client, "aclose", None) or client.close
+        await close()
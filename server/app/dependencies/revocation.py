@@ -0,0 +1,124 @@
+import logging
+import os
+import time
+
+from dotenv import load_dotenv
+from redis import RedisError
+
+from app.dependencies.redis_client import Subscriber, redis_client, redis_breaker
+from app.utils.bloom import BloomFilter
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Sorted set of revoked token ids scored by the token's expiry, and the channel
+# other workers listen on to learn about new revocations
+REVOKED_TOKENS_KEY = "revoked_tokens"
+REVOCATION_CHANNEL = "revoked_tokens"
+
+REVOCATION_BLOOM_CAPACITY = int(os.getenv("REVOCATION_BLOOM_CAPACITY") or 100000)
+REVOCATION_BLOOM_ERROR_RATE = float(os.getenv("REVOCATION_BLOOM_ERROR_RATE") or 0.001)
+# Expired ids are pruned and the filter rebuilt from Redis this often (seconds)
+REVOCATION_REBUILD_SECONDS = int(os.getenv("REVOCATION_REBUILD_SECONDS") or 3600)
+
+
+class _State:
+    bloom = BloomFilter(REVOCATION_BLOOM_CAPACITY, REVOCATION_BLOOM_ERROR_RATE)
+    # True while the listener is subscribed and the filter reflects Redis
+    synced = False
+    rebuilt_at = 0.0
+
+
+def _rebuild():
+    now = time.time()
+    pipe = redis_client.pipeline()
+    pipe.zremrangebyscore(REVOKED_TOKENS_KEY, "-inf", now)
+    pipe.zrangebyscore(REVOKED_TOKENS_KEY, now, "+inf")
+    _, jtis = pipe.execute()
+
+    bloom = BloomFilter(max(REVOCATION_BLOOM_CAPACITY, len(jtis) * 2), REVOCATION_BLOOM_ERROR_RATE)
+    for jti in jtis:
+        bloom.add(jti)
+    _State.bloom = bloom
+    _State.rebuilt_at = time.monotonic()
+
+
+def _on_connect():
+    # Subscribed before loading, so no revocation falls between the two
+    _rebuild()
+    _State.synced = True
+
+
+def _on_disconnect():
+    # Keep the stale filter; unsynced lookups also ask Redis directly
+    _State.synced = False
+
+
+def _on_tick():
+    if time.monotonic() - _State.rebuilt_at > REVOCATION_REBUILD_SECONDS:
+        _rebuild()
+
+
+_subscriber = Subscriber(
+    REVOCATION_CHANNEL,
+    on_message=lambda jti: _State.bloom.add(jti),
+    on_connect=_on_connect,
+    on_disconnect=_on_disconnect,
+    on_tick=_on_tick,
+)
+
+
+def start_revocation_sync():
+    """Start the background thread that mirrors the Redis revocation set into the Bloom filter"""
+    _subscriber.start()
+
+
+def stop_revocation_sync():
+    _subscriber.stop()
+
+
+def revoke_token(jti: str, expires_at: float) -> bool:
+    """Revoke a token id until the token's own expiry (unix seconds).
+
+    Returns False if the revocation could not be stored in Redis; it then only
+    applies on this worker.
+    """
+    _State.bloom.add(jti)
+    if not redis_breaker.allow():
+        return False
+
+    try:
+        pipe = redis_client.pipeline()
+        pipe.zadd(REVOKED_TOKENS_KEY, {jti: expires_at})
+        pipe.publish(REVOCATION_CHANNEL, jti)
+        pipe.execute()
+    except (RedisError, OSError) as e:
+        redis_breaker.record_failure()
+        logger.warning(f"Storing token revocation failed: {e}")
+        return False
+    redis_breaker.record_success()
+    return True
+
+
+def is_token_revoked(jti: str) -> bool:
+    """Check a token id, normally with only an in-memory probe.
+
+    A filter miss is authoritative while synced. A filter hit, or any lookup while
+    the listener is disconnected, is confirmed against Redis.
+    """
+    maybe_revoked = jti in _State.bloom
+    if not maybe_revoked and _State.synced:
+        return False
+    if not redis_breaker.allow():
+        return maybe_revoked
+
+    try:
+        revoked = redis_client.zscore(REVOKED_TOKENS_KEY, jti) is not None
+    except (RedisError, OSError) as e:
+        redis_breaker.record_failure()
+        logger.warning(f"Token revocation lookup failed: {e}")
+        # A filter hit is almost always a real revocation; without one there is nothing to go on
+        return maybe_revoked
+    redis_breaker.record_success()
+    return revoked
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Awaitable, Callable, Optional
+
+from dotenv import load_dotenv
+
+from app.dependencies.redis_client import cache_client, async_cache_client
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# How long a worker may hold the cross-worker lock for one computation (seconds)
+SINGLE_FLIGHT_LOCK_TTL = float(os.getenv("SINGLE_FLIGHT_LOCK_TTL") or 30)
+# How long a waiting caller waits for the leader before computing itself
+SINGLE_FLIGHT_WAIT = float(os.getenv("SINGLE_FLIGHT_WAIT") or 15)
+POLL_INTERVAL = 0.05
+
+# In-flight computations in this process: thread futures for def routes, asyncio futures for async ones
+_thread_flights: dict = {}
+_thread_lock = threading.Lock()
+_async_flights: dict = {}
+
+
+def _lock_key(key: str) -> str:
+    return f"lock:{key}"
+
+
+def acquire_lock(key: str) -> Optional[str]:
+    """Take the cross-worker lock for ``key``; returns a token to release it with, or None"""
+    token = uuid.uuid4().hex
+    if cache_client.set(_lock_key(key), token, nx=True, px=int(SINGLE_FLIGHT_LOCK_TTL * 1000)):
+        return token
+    return None
+
+
+def release_lock(key: str, token: str):
+    # Only release our own lock; it may have expired and been taken by another worker
+    if cache_client.get(_lock_key(key)) == token:
+        cache_client.delete(_lock_key(key))
+
+
+async def acquire_lock_async(key: str) -> Optional[str]:
+    token = uuid.uuid4().hex
+    if await async_cache_client.set(_lock_key(key), token, nx=True, px=int(SINGLE_FLIGHT_LOCK_TTL * 1000)):
+        return token
+    return None
+
+
+async def release_lock_async(key: str, token: str):
+    if await async_cache_client.get(_lock_key(key)) == token:
+        await async_cache_client.delete(_lock_key(key))
+
+
+def _wait_for_worker(key: str, lookup: Callable[[], Optional[str]]) -> Optional[str]:
+    # Poll until the lock holder stores a value, gives up the lock, or we run out of patience
+    deadline = time.monotonic() + SINGLE_FLIGHT_WAIT
+    while time.monotonic() < deadline:
+        value = lookup()
+        if value is not None:
+            return value
+        if cache_client.get(_lock_key(key)) is None:
+            return lookup()
+        time.sleep(POLL_INTERVAL)
+    return None
+
+
+async def _wait_for_worker_async(key: str, lookup: Callable[[], Awaitable[Optional[str]]]) -> Optional[str]:
+    deadline = time.monotonic() + SINGLE_FLIGHT_WAIT
+    while time.monotonic() < deadline:
+        value = await lookup()
+        if value is not None:
+            return value
+        if await async_cache_client.get(_lock_key(key)) is None:
+            return await lookup()
+        await asyncio.sleep(POLL_INTERVAL)
+    return None
+
+
+def run_once(key: str, compute: Callable, lookup: Callable[[], Optional[str]]):
+    """Run ``compute`` once per ``key`` across threads and workers.
+
+    ``compute`` must store its result where ``lookup`` finds it. Returns
+    ``(True, compute())`` to the caller that ran it and ``(False, lookup())`` to
+    callers that waited for another one. A waiter whose leader failed or took
+    longer than SINGLE_FLIGHT_WAIT computes by itself.
+    """
+    with _thread_lock:
+        future = _thread_flights.get(key)
+        leader = future is None
+        if leader:
+            future = _thread_flights[key] = Future()
+
+    if not leader:
+        try:
+            if future.result(timeout=SINGLE_FLIGHT_WAIT):
+                value = lookup()
+                if value is not None:
+                    return False, value
+        except FutureTimeoutError:
+            logger.warning(f"Single-flight wait timed out for {key}")
+        return True, compute()
+
+    stored = False
+    try:
+        token = acquire_lock(key)
+        if token is None:
+            value = _wait_for_worker(key, lookup)
+            if value is not None:
+                stored = True
+                return False, value
+        try:
+            result = compute()
+            stored = True
+            return True, result
+        finally:
+            if token:
+                release_lock(key, token)
+    finally:
+        with _thread_lock:
+            _thread_flights.pop(key, None)
+        future.set_result(stored)
+
+
+async def run_once_async(key: str, compute: Callable[[], Awaitable], lookup: Callable[[], Awaitable[Optional[str]]]):
+    """``run_once`` for async routes; waiters in this process share an asyncio future"""
+    future = _async_flights.get(key)
+    if future is not None:
+        try:
+            if await asyncio.wait_for(asyncio.shield(future), SINGLE_FLIGHT_WAIT):
+                value = await lookup()
+                if value is not None:
+                    return False, value
+        except asyncio.TimeoutError:
+            logger.warning(f"Single-flight wait timed out for {key}")
+        return True, await compute()
+
+    future = _async_flights[key] = asyncio.get_running_loop().create_future()
+    stored = False
+    try:
+        token = await acquire_lock_async(key)
+        if token is None:
+            value = await _wait_for_worker_async(key, lookup)
+            if value is not None:
+                stored = True
+                return False, value
+        try:
+            result = await compute()
+            stored = True
+            return True, result
+        finally:
+            if token:
+                await release_lock_async(key, token)
+    finally:
+        _async_flights.pop(key, None)
+        future.set_result(stored)
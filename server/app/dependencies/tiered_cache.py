@@ -0,0 +1,157 @@
+import json
+import logging
+import os
+import uuid
+from typing import Optional
+
+from dotenv import load_dotenv
+from redis import RedisError
+
+from app.dependencies.redis_client import (
+    LocalCache,
+    Subscriber,
+    async_raw_cache_client,
+    async_redis_client,
+    raw_cache_client,
+    redis_breaker,
+    redis_client,
+)
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Keys deleted on any worker are published here so every worker drops its L1 copy
+INVALIDATION_CHANNEL = "cache_invalidation"
+
+L1_CACHE_MAXSIZE = int(os.getenv("L1_CACHE_MAXSIZE") or 2048)
+# Upper bound on how long a value lives in L1; the Redis TTL still applies beneath it
+L1_CACHE_TTL = float(os.getenv("L1_CACHE_TTL") or 60)
+
+
+class TieredCache:
+    """Per-process LRU (L1) in front of Redis (L2).
+
+    Reads try L1, then L2, and fill L1 on the way back. Writes and deletes update
+    both tiers and broadcast the key so other workers drop their L1 copy. L1 is only
+    used while this worker's invalidation listener is connected; otherwise every
+    read goes to L2, since invalidations from other workers could be missed.
+
+    Values are bytes, normally produced by ``app.utils.codec``.
+    """
+
+    def __init__(self, maxsize: int = L1_CACHE_MAXSIZE, l1_ttl: float = L1_CACHE_TTL):
+        self.l1 = LocalCache(maxsize)
+        self.l1_ttl = l1_ttl
+        self.listening = False
+        # Bumped on every invalidation; a read only fills L1 if no invalidation arrived meanwhile
+        self._generation = 0
+        # Lets a worker ignore its own broadcasts, which it has already applied
+        self._origin = uuid.uuid4().hex
+        self._subscriber = Subscriber(
+            INVALIDATION_CHANNEL,
+            on_message=self._on_invalidation,
+            on_connect=self._on_connect,
+            on_disconnect=self._on_disconnect,
+        )
+
+    def _l1_ttl(self, ex: Optional[float]) -> float:
+        return min(ex, self.l1_ttl) if ex else self.l1_ttl
+
+    def _message(self, keys) -> str:
+        return json.dumps({"origin": self._origin, "keys": list(keys)})
+
+    def _on_invalidation(self, data: str):
+        message = json.loads(data)
+        if message["origin"] == self._origin:
+            return
+        self._generation += 1
+        self.l1.delete(*message["keys"])
+
+    def _broadcast(self, keys):
+        if redis_breaker.allow():
+            try:
+                redis_client.publish(INVALIDATION_CHANNEL, self._message(keys))
+            except (RedisError, OSError) as e:
+                logger.warning(f"Cache invalidation broadcast failed: {e}")
+
+    async def _abroadcast(self, keys):
+        if redis_breaker.allow():
+            try:
+                await async_redis_client.publish(INVALIDATION_CHANNEL, self._message(keys))
+            except (RedisError, OSError) as e:
+                logger.warning(f"Cache invalidation broadcast failed: {e}")
+
+    def _on_connect(self):
+        # Whatever was published while disconnected is lost, so start L1 from empty
+        self._generation += 1
+        self.l1.clear()
+        self.listening = True
+
+    def _on_disconnect(self):
+        self.listening = False
+        self._generation += 1
+        self.l1.clear()
+
+    def start(self):
+        self._subscriber.start()
+
+    def stop(self):
+        self._subscriber.stop()
+
+    def get(self, key):
+        if self.listening:
+            value = self.l1.get(key)
+            if value is not None:
+                return value
+        generation = self._generation
+        value = raw_cache_client.get(key)
+        if value is not None and self.listening and generation == self._generation:
+            self.l1.set(key, value, ex=self._l1_ttl(None))
+        return value
+
+    def set(self, key, value, ex=None):
+        raw_cache_client.set(key, value, ex=ex)
+        if self.listening:
+            self.l1.set(key, value, ex=self._l1_ttl(ex))
+        # Other workers may hold the previous value in L1
+        self._broadcast([key])
+
+    def delete(self, *keys):
+        if not keys:
+            return
+        self._generation += 1
+        self.l1.delete(*keys)
+        raw_cache_client.delete(*keys)
+        self._broadcast(keys)
+
+    async def aget(self, key):
+        if self.listening:
+            value = self.l1.get(key)
+            if value is not None:
+                return value
+        generation = self._generation
+        value = await async_raw_cache_client.get(key)
+        if value is not None and self.listening and generation == self._generation:
+            self.l1.set(key, value, ex=self._l1_ttl(None))
+        return value
+
+    async def aset(self, key, value, ex=None):
+        await async_raw_cache_client.set(key, value, ex=ex)
+        if self.listening:
+            self.l1.set(key, value, ex=self._l1_ttl(ex))
+        await self._abroadcast([key])
+
+    async def adelete(self, *keys):
+        if not keys:
+            return
+        self._generation += 1
+        self.l1.delete(*keys)
+        await async_raw_cache_client.delete(*keys)
+        await self._abroadcast(keys)
+
+    def stats(self) -> dict:
+        return {"listening": self.listening, "l1": self.l1.stats()}
+
+
+tiered_cache = TieredCache()
@@ -1,5 +1,8 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from app.config.log import setup_logging
+setup_logging()
+
 from app.router.auth import router as auth_router
 from app.router.chat_with_pdf import router as chat_with_pdf
 from app.router.teacherInsight import router as teacher_insight_router
@@ -15,10 +18,18 @@ from app.router.ai_evaluator import router as ai_evaluator_router
 from app.router.submission import router as submission_router
 from app.router.teachSession import router as teach_session_router
 from app.router.peerLearning import router as peer_learning_router
+from app.router.metrics import router as metrics_router
 from app.router.websocket import sio  # Import the Socket.IO server instance
-from app.config.db import Base, engine
+from app.config.db import Base, engine, mark_primary_sticky
+from app.config.metrics import start_query_stats, finish_query_stats
+from app.dependencies.redis_client import start_redis_health_check, stop_redis_health_check, close_async_redis
+from app.dependencies.revocation import start_revocation_sync, stop_revocation_sync
+from app.dependencies.tiered_cache import tiered_cache
 from app.models import auth, notes, teacherInsight, teachSession, assignment, docsupload, InterviewPreparation, studentInsight, peerLearning
 import socketio
+import logging
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
@@ -34,15 +45,62 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let the client read pagination cursors and per-request DB stats
+    expose_headers=["X-Next-Cursor", "X-Cache", "ETag", "Last-Modified", "X-DB-Query-Count", "X-DB-Time-Ms", "X-DB-N-Plus-One"],
 )
 
 
+# Keep a client's reads on the primary right after it writes (read-your-writes)
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    response = await call_next(request)
+    if request.method in ("POST", "PUT", "PATCH", "DELETE") and response.status_code < 400:
+        mark_primary_sticky(response)
+    return response
+
+
+# Count SQL statements per request and flag repeated statement shapes (N+1)
+@app.middleware("http")
+async def query_stats(request: Request, call_next):
+    stats, token = start_query_stats()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        summary = finish_query_stats(token, request.method, request.url.path, status_code, stats)
+
+    response.headers["X-DB-Query-Count"] = str(summary["queries"])
+    response.headers["X-DB-Time-Ms"] = f"{summary['db_ms']:.1f}"
+    if summary["n_plus_one"]:
+        worst = summary["n_plus_one"][0]
+        response.headers["X-DB-N-Plus-One"] = str(len(summary["n_plus_one"]))
+        logger.warning(
+            f"Possible N+1 on {request.method} {request.url.path}: {summary['queries']} queries, "
+            f"{worst['count']}x {worst['statement'][:200]}"
+        )
+    else:
+        logger.debug(f"{request.method} {request.url.path}: {summary['queries']} queries in {summary['db_ms']:.1f} ms")
+    return response
+
+
 # Base.metadata.create_all(bind=engine)
 
 @app.on_event("startup")
 def on_startup():
-    print("Creating database tables (if not exist)...")
+    logger.info("Creating database tables (if not exist)...")
     Base.metadata.create_all(bind=engine)
+    start_redis_health_check()
+    start_revocation_sync()
+    tiered_cache.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    stop_redis_health_check()
+    stop_revocation_sync()
+    tiered_cache.stop()
+    await close_async_redis()
 
 app.include_router(auth_router, prefix="/auth", tags=["auth"])
 app.include_router(chat_with_pdf, prefix="/pdf", tags=["PDF Chat"])
@@ -59,6 +117,7 @@ app.include_router(ai_evaluator_router, prefix="/ai-evaluator", tags=["AI Evalua
 app.include_router(submission_router, prefix="/submissions", tags=["Submissions"])
 app.include_router(teach_session_router, prefix="/teach-sessions", tags=["Teach-to-Learn Sessions"])
 app.include_router(peer_learning_router, prefix="/peer-learning", tags=["Peer Learning"])
+app.include_router(metrics_router, prefix="/metrics", tags=["Metrics"])
 
 # Wrap FastAPI app with Socket.IO
 socket_app = socketio.ASGIApp(sio, other_asgi_app=app, socketio_path='/socket.io')
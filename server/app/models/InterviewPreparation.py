@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Enum, Integer, String, DateTime, Table, ForeignKey, JSON
+from sqlalchemy import Boolean, Column, Enum, Integer, String, DateTime, Table, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from ..config.db import Base
 import uuid
@@ -19,4 +19,8 @@ class InterviewPrep(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    owner = relationship("User", back_populates="interviewpreps")
\ No newline at end of file
+    owner = relationship("User", back_populates="interviewpreps")
+
+    __table_args__ = (
+        Index("ix_interviewpreps_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Enum, Integer, String, DateTime, Table, ForeignKey, JSON
+from sqlalchemy import Boolean, Column, Enum, Integer, String, DateTime, Table, ForeignKey, JSON, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from ..config.db import Base
 import uuid
@@ -25,6 +25,11 @@ class Assignment(Base):
     group_id = Column(String, ForeignKey("teacher_insights.id"), nullable=False)
     group = relationship("TeacherInsight", back_populates="assignments")
 
+    __table_args__ = (
+        Index("ix_assignments_group_id_due_date", "group_id", "due_date"),
+        Index("ix_assignments_owner_id_created_at_id", "owner_id", "created_at", "id"),
+    )
+
 
 
 class AssignmentQuestion(Base):
@@ -51,4 +56,9 @@ class Submission(Base):
     feedback = Column(String)
 
     assignment = relationship("Assignment", back_populates="submissions")
-    student = relationship("User", back_populates="submissions")
\ No newline at end of file
+    student = relationship("User", back_populates="submissions")
+
+    # One submission per student per assignment
+    __table_args__ = (
+        UniqueConstraint("student_id", "assignment_id", name="uq_submissions_student_id_assignment_id"),
+    )
\ No newline at end of file
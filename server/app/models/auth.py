@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Enum, Integer, String, DateTime, Table, ForeignKey
+from sqlalchemy import Boolean, Column, Enum, Integer, String, DateTime, Table, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from ..config.db import Base
 import uuid
@@ -14,6 +14,7 @@ group_members = Table(
     Base.metadata,
     Column("group_id", String, ForeignKey("teacher_insights.id"), primary_key=True),
     Column("user_id", String, ForeignKey("users.id"), primary_key=True),
+    Index("ix_group_members_user_id", "user_id"),
 )
 
 class User(Base):
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Enum, Integer, String, DateTime, Table, ForeignKey, JSON
+from sqlalchemy import Boolean, Column, Enum, Integer, String, DateTime, Table, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from ..config.db import Base
 import uuid
@@ -19,4 +19,9 @@ class DocsUpload(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     owner = relationship("User", back_populates="docsuploads")
-    group = relationship("TeacherInsight", back_populates="docsuploads")
\ No newline at end of file
+    group = relationship("TeacherInsight", back_populates="docsuploads")
+
+    __table_args__ = (
+        Index("ix_docsuploads_group_id_updated_at", "group_id", "updated_at"),
+        Index("ix_docsuploads_owner_id_updated_at_id", "owner_id", "updated_at", "id"),
+    )
\ No newline at end of file
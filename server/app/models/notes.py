@@ -1,11 +1,15 @@
-from sqlalchemy import Boolean, Column, Enum, Integer, String, DateTime, Table, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Boolean, Column, Enum, Integer, String, DateTime, Table, ForeignKey, Index, func
+from sqlalchemy.orm import relationship, column_property
 from ..config.db import Base
 import uuid
 import enum
 from datetime import datetime
 
 
+# Characters of content returned as the excerpt in note lists
+NOTE_EXCERPT_LENGTH = 200
+
+
 class Note(Base):
     __tablename__ = "notes"
 
@@ -21,4 +25,15 @@ class Note(Base):
     owner_id = Column(String, ForeignKey("users.id"), nullable=False)
     group_id = Column(String, ForeignKey("teacher_insights.id"), nullable=False)
 
-    group = relationship("TeacherInsight", back_populates="notes")
\ No newline at end of file
+    group = relationship("TeacherInsight", back_populates="notes")
+
+    # Computed in SQL for list views so the full content never leaves the database.
+    # Deferred: only loaded when a query asks for them with undefer().
+    excerpt = column_property(func.substr(content, 1, NOTE_EXCERPT_LENGTH), deferred=True)
+    content_size = column_property(func.length(content), deferred=True)
+
+    # Keyset pagination orders lists by (created_at, id) within an owner or group
+    __table_args__ = (
+        Index("ix_notes_group_id_created_at_id", "group_id", "created_at", "id"),
+        Index("ix_notes_owner_id_created_at_id", "owner_id", "created_at", "id"),
+    )
\ No newline at end of file
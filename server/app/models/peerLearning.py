@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, JSON, Integer, Text, Float
+from sqlalchemy import Column, String, DateTime, ForeignKey, JSON, Integer, Text, Float, Index
 from sqlalchemy.orm import relationship
 from ..config.db import Base
 import uuid
@@ -32,8 +32,8 @@ class PeerLearningSession(Base):
     # Rewards
     coins_earned = Column(Integer, default=0)  # Coins earned by the teacher from this session
     
-    # Enrollment tracking
-    enrolled_student_ids = Column(JSON, default=list)  # List of student IDs who joined
+    # Enrollment tracking (rows live in peer_session_enrollments; this is a denormalized count)
+    enrolled_count = Column(Integer, default=0, nullable=False)
     
     # Timing
     scheduled_at = Column(DateTime, nullable=True)
@@ -47,6 +47,30 @@ class PeerLearningSession(Base):
     messages = relationship("PeerSessionMessage", back_populates="peer_session", cascade="all, delete-orphan")
     ratings = relationship("PeerSessionRating", back_populates="peer_session", cascade="all, delete-orphan")
     whiteboard_data = relationship("PeerWhiteboardData", back_populates="peer_session", cascade="all, delete-orphan")
+    enrollments = relationship("PeerSessionEnrollment", back_populates="peer_session", cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        Index("ix_peer_learning_sessions_status_created_at", "status", "created_at"),
+        Index("ix_peer_learning_sessions_teacher_user_id_created_at_id", "teacher_user_id", "created_at", "id"),
+    )
+
+
+class PeerSessionEnrollment(Base):
+    """Model for students enrolled in a peer learning session"""
+    __tablename__ = "peer_session_enrollments"
+
+    peer_session_id = Column(String, ForeignKey("peer_learning_sessions.id", ondelete="CASCADE"), primary_key=True)
+    student_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    enrolled_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    peer_session = relationship("PeerLearningSession", back_populates="enrollments")
+    student = relationship("User", foreign_keys=[student_id])
+
+    # "Which sessions am I in" lookups by student
+    __table_args__ = (
+        Index("ix_peer_session_enrollments_student_id", "student_id"),
+    )
 
 
 class PeerSessionMessage(Base):
@@ -72,6 +96,10 @@ class PeerSessionMessage(Base):
     peer_session = relationship("PeerLearningSession", back_populates="messages")
     sender = relationship("User", foreign_keys=[sender_id])
 
+    __table_args__ = (
+        Index("ix_peer_session_messages_peer_session_id_created_at", "peer_session_id", "created_at"),
+    )
+
 
 class PeerSessionRating(Base):
     """Model for storing ratings and feedback for peer learning sessions"""
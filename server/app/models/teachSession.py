@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, JSON, Integer, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, JSON, Integer, Text, Index
 from sqlalchemy.orm import relationship
 from ..config.db import Base
 import uuid
@@ -38,6 +38,10 @@ class TeachSession(Base):
     messages = relationship("TeachSessionMessage", back_populates="session", cascade="all, delete-orphan")
     whiteboard_data = relationship("WhiteboardData", back_populates="session", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_teach_sessions_student_id_created_at_id", "student_id", "created_at", "id"),
+    )
+
 
 class TeachSessionMessage(Base):
     """Model for storing conversation messages in teach sessions"""
@@ -58,6 +62,10 @@ class TeachSessionMessage(Base):
     # Relationships
     session = relationship("TeachSession", back_populates="messages")
 
+    __table_args__ = (
+        Index("ix_teach_session_messages_session_id_created_at", "session_id", "created_at"),
+    )
+
 
 class WhiteboardData(Base):
     """Model for storing whiteboard/drawing data from teach sessions"""
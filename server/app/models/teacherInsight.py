@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Enum, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Boolean, Column, Enum, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.config.db import Base
 from app.models.auth import group_members
@@ -26,5 +26,10 @@ class TeacherInsight(Base):
 
     assignments = relationship("Assignment", back_populates="group", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_teacher_insights_created_at_id", "created_at", "id"),
+        Index("ix_teacher_insights_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
+
 
 
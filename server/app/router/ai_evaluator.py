@@ -1,10 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from app.models.assignment import Assignment, Submission
 from app.models.auth import User, userRole
-from app.dependencies.dependencies import get_db, get_current_user
+from app.dependencies.dependencies import get_async_db, get_current_user
+from app.dependencies.cache import invalidate_tags_async, owner_tag
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
+from app.utils.llm import get_llm
 from langchain_core.messages import HumanMessage
 import json
 import logging
@@ -14,15 +18,10 @@ from datetime import datetime
 load_dotenv()
 
 # ===== Logging =====
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # ===== LLM Setup =====
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    temperature=0.2,
-    api_version="v1",
-)
+llm = get_llm(temperature=0.2, api_version="v1")
 
 # ===== Helper =====
 def clean_json_output(output: str):
@@ -37,7 +36,7 @@ router = APIRouter()
 async def evaluate_answers(
     assignment_id: str,
     answers: dict[str, str],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     """Evaluate assignment answers and return a detailed JSON structure."""
@@ -50,17 +49,23 @@ async def evaluate_answers(
         )
 
     # --- 2️⃣ Duplicate check ---
-    if db.query(Submission).filter(
-        Submission.student_id == current_user.id,
-        Submission.assignment_id == assignment_id
-    ).first():
+    if await db.scalar(
+        select(Submission.id).where(
+            Submission.student_id == current_user.id,
+            Submission.assignment_id == assignment_id
+        )
+    ):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="You have already submitted this assignment."
         )
 
     # --- 3️⃣ Fetch assignment ---
-    assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
+    assignment = await db.scalar(
+        select(Assignment)
+        .where(Assignment.id == assignment_id)
+        .options(selectinload(Assignment.questions))
+    )
     if not assignment:
         raise HTTPException(status_code=404, detail="Assignment not found.")
     if not assignment.questions:
@@ -120,7 +125,7 @@ Rules:
 
     # --- 7️⃣ Invoke AI safely ---
     try:
-        response = llm.invoke([HumanMessage(content=prompt)])
+        response = await llm.ainvoke([HumanMessage(content=prompt)])
         cleaned = clean_json_output(response.content)
         result = json.loads(cleaned)
     except json.JSONDecodeError:
@@ -148,8 +153,17 @@ Rules:
         feedback=result.get("final_feedback", "No feedback."),
     )
     db.add(new_submission)
-    db.commit()
-    db.refresh(new_submission)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent request for the same student/assignment won the unique constraint
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You have already submitted this assignment."
+        )
+    await db.refresh(new_submission)
+    await invalidate_tags_async(owner_tag("submissions", current_user.id))
 
     # --- 9️⃣ Return clean structured response ---
     return {
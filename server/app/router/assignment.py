@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Form, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Form, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from datetime import datetime
 from app.schemas.assignment import (
@@ -12,9 +13,12 @@ from app.models.assignment import Assignment, AssignmentQuestion, Submission
 from app.models.auth import User, group_members
 from app.schemas.auth import UserResponse
 from app.models.auth import userRole
-from app.dependencies.dependencies import get_db, get_current_user
+from app.dependencies.dependencies import get_async_db, get_async_read_db, get_current_user
 from app.models.teacherInsight import TeacherInsight
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, selectinload
+from app.utils.pagination import Page, bounded_page_params, paginate, finish_page
+from app.dependencies.cache import cached, add_cache_tags, invalidate_tags_async, user_tag, group_tag, owner_tag
+from app.utils.conditional import check_not_modified, check_row_not_modified
 
 
 router = APIRouter()
@@ -25,7 +29,7 @@ async def create_assignment(
     title: str = Form(...),
     description: str = Form(...),
     due_date: datetime = Form(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     if not current_user:
@@ -45,10 +49,8 @@ async def create_assignment(
             status_code=status.HTTP_400_BAD_REQUEST, detail="missing required fields"
         )
 
-    teacher_group = (
-        db.query(TeacherInsight)
-        .filter(TeacherInsight.user_id == current_user.id)
-        .first()
+    teacher_group = await db.scalar(
+        select(TeacherInsight).where(TeacherInsight.user_id == current_user.id).limit(1)
     )
 
     if not teacher_group:
@@ -66,14 +68,38 @@ async def create_assignment(
     )
 
     db.add(new_assignment)
-    db.commit()
-    db.refresh(new_assignment)
+    await db.commit()
+    await db.refresh(new_assignment)
+    await invalidate_tags_async(group_tag("assignments", new_assignment.group_id), owner_tag("assignments", current_user.id))
     return new_assignment
 
 
-@router.get("/assignments", response_model=List[AssignmentBase])
+async def assignments_not_modified(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    validators = select(func.max(Assignment.updated_at), func.count(Assignment.id))
+    if current_user.role == userRole.TEACHER:
+        validators = validators.where(Assignment.owner_id == current_user.id)
+    else:
+        validators = validators.where(
+            Assignment.group_id.in_(
+                select(group_members.c.group_id).where(group_members.c.user_id == current_user.id)
+            )
+        )
+    last_modified, count = (await db.execute(validators)).one()
+    check_not_modified(request, response, last_modified, count, current_user.id)
+
+
+@router.get("/assignments", response_model=List[AssignmentBase], dependencies=[Depends(assignments_not_modified)])
+@cached("assignments", List[AssignmentBase], tags=lambda kw: [user_tag(kw["current_user"].id)])
 async def get_assignments(
-    db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
+    response: Response,
+    page: Page = Depends(bounded_page_params()),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user),
 ):
     if not current_user:
         raise HTTPException(
@@ -82,22 +108,21 @@ async def get_assignments(
         )
 
     if current_user.role == userRole.TEACHER:
-        assignments = (
-            db.query(Assignment).filter(Assignment.owner_id == current_user.id).all()
-        )
+        query = select(Assignment).where(Assignment.owner_id == current_user.id)
+        add_cache_tags(owner_tag("assignments", current_user.id))
     else:
-        assignments = (
-            db.query(Assignment)
-            .join(TeacherInsight, Assignment.group_id == TeacherInsight.id)
-            .join(group_members, TeacherInsight.id == group_members.c.group_id)
-            .filter(group_members.c.user_id == current_user.id)
-            .options(joinedload(Assignment.group))
-            .all()
-        )
+        group_ids = (
+            await db.scalars(select(group_members.c.group_id).where(group_members.c.user_id == current_user.id))
+        ).all()
+        query = select(Assignment).where(Assignment.group_id.in_(group_ids))
+        add_cache_tags(*(group_tag("assignments", group_id) for group_id in group_ids))
 
-        assignments.sort(key=lambda x: x.created_at, reverse=True)
+    # Newest first
+    assignments = (
+        await db.scalars(paginate(query, page, Assignment.created_at, Assignment.id))
+    ).all()
 
-    return assignments
+    return finish_page(assignments, page, response)
 
 
 @router.get(
@@ -105,7 +130,9 @@ async def get_assignments(
 )
 async def get_assignment(
     assignment_id: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     if not current_user:
@@ -114,7 +141,11 @@ async def get_assignment(
             detail="not authorized to view assignment",
         )
 
-    assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
+    assignment = await db.scalar(
+        select(Assignment)
+        .where(Assignment.id == assignment_id)
+        .options(selectinload(Assignment.owner), selectinload(Assignment.questions))
+    )
 
     if not assignment:
         raise HTTPException(
@@ -139,12 +170,13 @@ async def get_assignment(
         # Check if student is part of the assignment's group
 
         member_exists = (
-            db.query(group_members)
-            .filter(
-                group_members.c.group_id == assignment.group_id,
-                group_members.c.user_id == current_user.id,
-            ).first()
-        )
+            await db.execute(
+                select(group_members).where(
+                    group_members.c.group_id == assignment.group_id,
+                    group_members.c.user_id == current_user.id,
+                )
+            )
+        ).first()
 
         if not member_exists:
             raise HTTPException(
@@ -152,13 +184,15 @@ async def get_assignment(
                 detail="not authorized to view this assignment",
             )
 
+    # Questions are only written together with the assignment, so its updated_at covers them
+    check_row_not_modified(request, response, assignment.updated_at)
     return assignment
 
 
 @router.delete("/delete-assignment/{assignment_id}", response_model=AssignmentResponse)
 async def delete_assignment(
     assignment_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     if not current_user or current_user.role != userRole.TEACHER:
@@ -166,17 +200,25 @@ async def delete_assignment(
             status_code=403, detail="Only teachers can delete assignments"
         )
 
-    assignment = (
-        db.query(Assignment)
-        .options(joinedload(Assignment.questions), joinedload(Assignment.submissions))
-        .filter(Assignment.id == assignment_id, Assignment.owner_id == current_user.id)
-        .first()
+    assignment = await db.scalar(
+        select(Assignment)
+        .options(
+            selectinload(Assignment.owner),
+            selectinload(Assignment.questions),
+            selectinload(Assignment.submissions),
+        )
+        .where(Assignment.id == assignment_id, Assignment.owner_id == current_user.id)
     )
 
     if not assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
 
-    db.delete(assignment)
-    db.commit()
+    await db.delete(assignment)
+    await db.commit()
+    await invalidate_tags_async(
+        group_tag("assignments", assignment.group_id),
+        owner_tag("assignments", current_user.id),
+        *(owner_tag("submissions", submission.student_id) for submission in assignment.submissions)
+    )
 
     return assignment
@@ -1,14 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, Response, UploadFile, File, Form, status
-from sqlalchemy.orm import Session, joinedload
-from app.config.db import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, UploadFile, File, Form, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, defer, undefer
+from app.config.db import get_db, get_async_db, get_read_db
 from app.schemas.auth import UserCreate, UserLogin, UserResponse, UserOut, userRole
 from app.models.auth import User
 from app.models.notes import Note
 from app.models.teacherInsight import TeacherInsight
 from app.schemas.notes import NotesResponse, NoteBaseResponse, TeacherNotesResponse
 from app.schemas.teacherInsight import TeacherInsightResponse, TeacherInsightBase
-from app.utils.utils import hash_password, verify_password, create_access_token
-from app.dependencies.dependencies import get_current_user
+from app.utils.utils import hash_password_async, verify_password_async, create_access_token, decode_access_token
+from app.dependencies.dependencies import get_current_user, get_request_token
+from app.dependencies.revocation import revoke_token
+from app.dependencies.cache import cached, add_cache_tags, user_tag, group_tag
+from app.utils.pagination import Page, page_params, paginate, finish_page, total_count
 from app.utils.cloudinary import upload_image, delete_image
 import logging
 
@@ -23,15 +28,15 @@ async def register(
     password: str = Form(...),
     role: str = Form("student"),
     image: UploadFile = File(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # check email
-    existing_user = db.query(User).filter(User.email == email).first()
+    existing_user = await db.scalar(select(User).where(User.email == email))
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    # hash password
-    hashed_password = hash_password(password)
+    # hash password (bcrypt runs on the dedicated hashing pool)
+    hashed_password = await hash_password_async(password)
 
     # upload image
     image_url, image_url_id = None, None
@@ -49,11 +54,11 @@ async def register(
         image_url_id=image_url_id
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
 
     # create JWT
-    access_token = create_access_token({"sub": db_user.email})
+    access_token = create_access_token({"sub": db_user.email, "uid": db_user.id, "role": userRole(db_user.role).value})
 
     # set cookie
     response.set_cookie(
@@ -69,25 +74,22 @@ async def register(
 
 
 @router.post("/login")
-def login(
+async def login(
     response: Response,
     email: str = Form(...),
     password: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    logger.info(f"=== Login attempt for email: {email} ===")
-    
-    db_user = db.query(User).filter(User.email == email).first()
+    db_user = await db.scalar(select(User).where(User.email == email))
     if not db_user:
-        logger.error(f"User not found for email: {email}")
+        logger.warning("Login failed: unknown email", extra={"email": email})
         raise HTTPException(status_code=400, detail="Invalid credentials")
     
-    if not verify_password(password, db_user.hashed_password):
-        logger.error(f"Invalid password for email: {email}")
+    if not await verify_password_async(password, db_user.hashed_password):
+        logger.warning("Login failed: wrong password", extra={"user_id": db_user.id})
         raise HTTPException(status_code=400, detail="Invalid credentials")
 
-    access_token = create_access_token({"sub": db_user.email})
-    logger.info(f"Access token created: {access_token[:20]}...")
+    access_token = create_access_token({"sub": db_user.email, "uid": db_user.id, "role": userRole(db_user.role).value})
 
     response.set_cookie(
         key="access_token",
@@ -99,15 +101,15 @@ def login(
         domain=None  # None allows cookie to work with any hostname (localhost or IP)
     )
     
-    logger.info(f"✅ Login successful for user: {email}")
-    logger.info(f"Cookie details - httponly=True, secure=False, samesite=lax, max_age={60*60*24*15}")
+    logger.info("Login succeeded", extra={"user_id": db_user.id})
 
     return {"message": "User logged in successfully"}
 
 
 @router.get("/me", response_model=UserResponse)
 def read_users_me(current_user: User = Depends(get_current_user)):
-    # Return user with coins from database
+    # From the cached Principal, so coins and profile can lag the database by up to
+    # PRINCIPAL_CACHE_TTL unless the write called invalidate_principal
     user_dict = {
         "id": current_user.id,
         "full_name": current_user.full_name,
@@ -120,7 +122,12 @@ def read_users_me(current_user: User = Depends(get_current_user)):
 
 
 @router.post("/logout", response_model=UserOut)
-def logout(response: Response, current_user: User = Depends(get_current_user)):
+def logout(request: Request, response: Response, current_user: User = Depends(get_current_user)):
+    # Revoke the token itself so copies of it stop working too, not just the cookie
+    payload = decode_access_token(get_request_token(request))
+    if payload.get("jti"):
+        if not revoke_token(payload["jti"], payload["exp"]):
+            logger.error("Token revocation not stored on logout", extra={"user_id": current_user.id})
     # response.delete_cookie("access_token")
     response.delete_cookie(
            key="access_token",
@@ -132,8 +139,11 @@ def logout(response: Response, current_user: User = Depends(get_current_user)):
 
 
 @router.get("/student/notes", response_model=TeacherNotesResponse)
+@cached("student-notes", TeacherNotesResponse, tags=lambda kw: [user_tag(kw["current_user"].id)])
 def get_group_notes_for_student(
-    db: Session = Depends(get_db),
+    response: Response,
+    page: Page = Depends(page_params),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     # Ensure only authenticated users can access
@@ -151,11 +161,22 @@ def get_group_notes_for_student(
 
     # Get all group IDs the student is part of
     group_ids = [group.id for group in student.groups]
-
-    # Fetch all notes for those groups
-    notes = db.query(Note).filter(Note.group_id.in_(group_ids)).all()
+    add_cache_tags(*(group_tag("notes", group_id) for group_id in group_ids))
+
+    # Fetch notes for those groups, newest first
+    query = (
+        db.query(Note)
+        .options(
+            joinedload(Note.owner),
+            defer(Note.content),
+            undefer(Note.excerpt),
+            undefer(Note.content_size)
+        )
+        .filter(Note.group_id.in_(group_ids))
+    )
+    notes = finish_page(paginate(query, page, Note.created_at, Note.id).all(), page, response)
 
     return {
-        "count": len(notes),
+        "count": total_count(query, notes, page),
         "notes": notes
     }
\ No newline at end of file
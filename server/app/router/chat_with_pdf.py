@@ -9,7 +9,7 @@ from app.dependencies.dependencies import get_current_user
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import Chroma
 from langchain_community.document_loaders import PyMuPDFLoader
-from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
+from app.utils.llm import get_llm, get_embeddings
 from langgraph.graph import StateGraph, END
 from typing import TypedDict, List, AsyncGenerator
 
@@ -23,10 +23,7 @@ class GraphState(TypedDict):
 
 def create_graph(db: Chroma):
     retriever = db.as_retriever(search_type="similarity", search_kwargs={"k": 3})
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",
-        model_kwargs={"streaming": True}
-    )
+    llm = get_llm(streaming=True)
 
     def retrieve(state: GraphState):
         docs = retriever.invoke(state["question"])
@@ -74,7 +71,7 @@ async def chat_with_pdf(
         text_splitter = RecursiveCharacterTextSplitter(chunk_size=1024, chunk_overlap=20)
         docs = text_splitter.split_documents(documents)
 
-        embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
+        embeddings = get_embeddings()
         db = Chroma.from_documents(docs, embeddings, persist_directory=persistent_directory)
         app = create_graph(db)
     except Exception as e:
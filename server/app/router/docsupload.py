@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, UploadFile, File, Form
+from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 from typing import List
 from app.schemas.docsupload import DocsUploadResponse, DocsBase
 from app.models.docsupload import DocsUpload
 from app.models.auth import User
-from app.config.db import get_db
+from app.config.db import get_db, get_read_db
 from app.dependencies.dependencies import get_current_user
+from app.utils.pagination import Page, bounded_page_params, paginate, finish_page, total_count
+from app.dependencies.cache import cached, add_cache_tags, invalidate_tags, user_tag, group_tag
+from app.utils.conditional import check_not_modified, check_row_not_modified
 from app.schemas.auth import userRole
 from app.utils.cloudinary import upload_image, delete_image
 from app.schemas.notes import TeacherNotesResponse
@@ -46,18 +50,49 @@ def upload_doc(filename: str = Form(...), file: UploadFile = File(...), db: Sess
     db.add(new_doc)
     db.commit()
     db.refresh(new_doc)
+    invalidate_tags(group_tag("docs", new_doc.group_id))
 
     return new_doc
 
 
-@router.get("/my-docs", response_model=List[DocsBase])
-def get_my_docs(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    docs = db.query(DocsUpload).filter(DocsUpload.owner_id == current_user.id).all()
-    docs.sort(key=lambda x: x.updated_at, reverse=True)
-    return docs
+def my_docs_not_modified(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    last_modified, count = (
+        db.query(func.max(DocsUpload.updated_at), func.count(DocsUpload.id))
+        .filter(DocsUpload.owner_id == current_user.id)
+        .one()
+    )
+    check_not_modified(request, response, last_modified, count, current_user.id)
+
+
+@router.get("/my-docs", response_model=List[DocsBase], dependencies=[Depends(my_docs_not_modified)])
+def get_my_docs(
+    response: Response,
+    page: Page = Depends(bounded_page_params()),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Most recently updated first
+    query = (
+        db.query(DocsUpload)
+        .options(joinedload(DocsUpload.owner))
+        .filter(DocsUpload.owner_id == current_user.id)
+    )
+    docs = paginate(query, page, DocsUpload.updated_at, DocsUpload.id).all()
+    return finish_page(docs, page, response, key=lambda d: (d.updated_at, d.id))
 
 @router.get("/my-docs/{doc_id}", response_model=DocsBase)
-def get_my_doc(doc_id: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_my_doc(
+    doc_id: str,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
     if not current_user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
     
@@ -66,11 +101,18 @@ def get_my_doc(doc_id: str, db: Session = Depends(get_db), current_user: User =
     if not docs:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
     
+    check_row_not_modified(request, response, docs.updated_at)
     return docs
 
 
 @router.get("/teacher-notes-with-docs", response_model=DocsUploadResponse)
-def get_teacher_notes_with_docs(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@cached("student-docs", DocsUploadResponse, tags=lambda kw: [user_tag(kw["current_user"].id)])
+def get_teacher_notes_with_docs(
+    response: Response,
+    page: Page = Depends(bounded_page_params()),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
     if not current_user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
     
@@ -86,12 +128,22 @@ def get_teacher_notes_with_docs(db: Session = Depends(get_db), current_user: Use
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No groups found for the user")
     
     group_ids = [group.id for group in docs.groups]
+    add_cache_tags(*(group_tag("docs", group_id) for group_id in group_ids))
 
-    docs_with_notes = db.query(DocsUpload).filter(DocsUpload.group_id.in_(group_ids)).all()
-    docs_with_notes.sort(key=lambda x: x.updated_at, reverse=True)
+    query = (
+        db.query(DocsUpload)
+        .options(joinedload(DocsUpload.owner))
+        .filter(DocsUpload.group_id.in_(group_ids))
+    )
+    docs_with_notes = finish_page(
+        paginate(query, page, DocsUpload.updated_at, DocsUpload.id).all(),
+        page,
+        response,
+        key=lambda d: (d.updated_at, d.id)
+    )
 
     return {
-        "count": len(docs_with_notes),
+        "count": total_count(query, docs_with_notes, page),
         "docsuploads": docs_with_notes
     }
 
@@ -111,5 +163,7 @@ def delete_doc(doc_id: str, db: Session = Depends(get_db), current_user: User =
     if doc.file_url_id:
         delete_image(doc.file_url_id)
 
+    group_id = doc.group_id
     db.delete(doc)
-    db.commit()
\ No newline at end of file
+    db.commit()
+    invalidate_tags(group_tag("docs", group_id))
\ No newline at end of file
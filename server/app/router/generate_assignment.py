@@ -1,17 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from datetime import datetime
 from app.schemas.assignment import AssignmentQuestionResponse
 from app.models.assignment import Assignment, AssignmentQuestion
 from app.models.auth import User, userRole
-from app.dependencies.dependencies import get_db, get_current_user
+from app.dependencies.dependencies import get_async_db, get_current_user
 from dotenv import load_dotenv
 from langchain_tavily import TavilySearch
 from fastapi.responses import JSONResponse
 from typing import TypedDict, Annotated
 from langgraph.graph import add_messages, StateGraph, END
-from langchain_google_genai import ChatGoogleGenerativeAI
+from app.utils.llm import get_llm
 from langchain_core.messages import HumanMessage
 import json
 import re
@@ -32,7 +33,7 @@ class State(TypedDict):
 # Initialize Tools
 # --------------------------
 search_tool = TavilySearch(max_results=2)
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0)
+llm = get_llm(temperature=0)
 
 
 # --------------------------
@@ -126,7 +127,7 @@ router = APIRouter()
 )
 async def generate_question(
     assignment_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     """Generate structured assignment questions (JSON format)."""
@@ -137,10 +138,8 @@ async def generate_question(
             detail="Only teachers can generate questions.",
         )
 
-    assignment = (
-        db.query(Assignment)
-        .filter(Assignment.id == assignment_id, Assignment.owner_id == current_user.id)
-        .first()
+    assignment = await db.scalar(
+        select(Assignment).where(Assignment.id == assignment_id, Assignment.owner_id == current_user.id)
     )
     if not assignment:
         raise HTTPException(
@@ -148,10 +147,8 @@ async def generate_question(
         )
 
     # Prevent duplicate generation
-    existing = (
-        db.query(AssignmentQuestion)
-        .filter(AssignmentQuestion.assignment_id == assignment_id)
-        .first()
+    existing = await db.scalar(
+        select(AssignmentQuestion.id).where(AssignmentQuestion.assignment_id == assignment_id).limit(1)
     )
     if existing:
         raise HTTPException(
@@ -166,7 +163,7 @@ async def generate_question(
         )
 
     try:
-        results = graph.invoke(
+        results = await graph.ainvoke(
             {
                 "des": [HumanMessage(content=assignment.description)],
                 "research": [],
@@ -182,8 +179,8 @@ async def generate_question(
             question_text=json.dumps(questions_json, indent=2),
         )
         db.add(question)
-        db.commit()
-        db.refresh(question)
+        await db.commit()
+        await db.refresh(question)
 
     except Exception as e:
         raise HTTPException(
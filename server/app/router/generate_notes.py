@@ -3,7 +3,7 @@ from app.dependencies.dependencies import get_current_user
 from app.models.auth import User, userRole
 from typing import TypedDict, Annotated
 from langgraph.graph import add_messages, StateGraph, END
-from langchain_google_genai import ChatGoogleGenerativeAI
+from app.utils.llm import get_llm
 from langchain_core.messages import HumanMessage
 from dotenv import load_dotenv
 # from langchain_community.tools.tavily_search import TavilySearchResults
@@ -29,7 +29,7 @@ search_tool = TavilySearch(max_results=3)
 # 2. Initialize LLM and Tavily Tool
 # -------------------------------
 
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0)
+llm = get_llm(temperature=0)
 
 
 # -------------------------------
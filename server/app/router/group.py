@@ -1,13 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Form
-from sqlalchemy.orm import Session, joinedload
-from app.config.db import get_db
-from app.models.auth import User, userRole
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Form, UploadFile, File
+from pydantic import ValidationError
+from sqlalchemy import exists, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
+from app.config.db import get_db, get_async_db
+from app.models.auth import User, userRole, group_members
 from app.dependencies.dependencies import get_current_user
 from app.models.teacherInsight import TeacherInsight
-from app.schemas.teacherInsight import TeacherInsightCreate, TeacherInsightResponse, TeacherInsightBase, JoinGroupRequest
+from app.schemas.teacherInsight import (
+    TeacherInsightCreate,
+    TeacherInsightResponse,
+    TeacherInsightBase,
+    JoinGroupRequest,
+    RosterEntry,
+    RosterRowResult,
+    RosterImportResponse
+)
 from app.schemas.auth import UserResponse
+from app.utils.pagination import Page, page_params, paginate, finish_page
+from app.utils.utils import hash_password_async, password_hash_pool
+from app.dependencies.cache import invalidate_tags, invalidate_tags_async, user_tag
+import asyncio
+import csv
+import io
+import json
+import secrets
+import uuid
+
+# Largest roster accepted in one import request
+MAX_ROSTER_ROWS = 1000
 
 router = APIRouter()
+
+
 @router.post("/join", response_model=TeacherInsightResponse)
 def join_group(
     request: JoinGroupRequest,
@@ -55,6 +81,7 @@ def join_group(
     db.add(group)  # Explicitly add to session
     db.commit()
     db.refresh(group)
+    invalidate_tags(user_tag(orm_user.id))
 
     return group
 
@@ -80,21 +107,28 @@ def check_if_user_joined_group(
         )
 
     # Find the group
-    group = db.query(TeacherInsight).filter(TeacherInsight.id == group_id).first()
-    if not group:
+    group_exists = db.query(TeacherInsight.id).filter(TeacherInsight.id == group_id).first()
+    if not group_exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Group not found."
         )
 
-    # Check if user is in the group's members
-    is_member = current_user in group.members
+    # Check membership with a primary-key lookup instead of loading every member
+    is_member = db.query(
+        exists().where(
+            group_members.c.group_id == group_id,
+            group_members.c.user_id == current_user.id
+        )
+    ).scalar()
 
     return {"group_id": group_id, "joined": is_member}
 
 
 @router.get("/view-students", response_model=list[TeacherInsightResponse])
 def view_students_in_teacher_groups(
+    response: Response,
+    page: Page = Depends(page_params),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -113,10 +147,13 @@ def view_students_in_teacher_groups(
         )
 
     #  Fetch only groups owned by this teacher
-    groups = (
+    query = (
         db.query(TeacherInsight)
+        .options(joinedload(TeacherInsight.owner), selectinload(TeacherInsight.members))
         .filter(TeacherInsight.user_id == current_user.id)
-        .all()
+    )
+    groups = finish_page(
+        paginate(query, page, TeacherInsight.created_at, TeacherInsight.id).all(), page, response
     )
 
     if not groups:
@@ -149,3 +186,179 @@ def view_students_in_teacher_groups(
 
     return result
 
+
+def parse_roster(filename: str, raw: bytes) -> list:
+    """Parse an uploaded roster into dict rows.
+
+    Accepts a JSON array of objects or a CSV file with a header row
+    (full_name or name, email, optional password).
+    """
+    try:
+        text = raw.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Roster file must be UTF-8 encoded.")
+
+    if filename.lower().endswith(".json") or text.lstrip().startswith("["):
+        try:
+            rows = json.loads(text)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Roster file is not valid JSON.")
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise HTTPException(status_code=400, detail="JSON roster must be an array of objects.")
+    else:
+        reader = csv.DictReader(io.StringIO(text))
+        if not reader.fieldnames:
+            raise HTTPException(status_code=400, detail="CSV roster needs a header row.")
+        rows = [
+            {(key or "").strip().lower(): (value or "").strip() for key, value in row.items()}
+            for row in reader
+        ]
+
+    normalized = []
+    for row in rows:
+        row = dict(row)
+        if "full_name" not in row and "name" in row:
+            row["full_name"] = row.pop("name")
+        if not row.get("password"):
+            row["password"] = None
+        normalized.append(row)
+    return normalized
+
+
+@router.post("/{group_id}/roster-import", response_model=RosterImportResponse)
+async def import_group_roster(
+    group_id: str,
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Create student accounts from a CSV/JSON roster and add them to one of the teacher's groups.
+
+    Rows are validated and reported individually; all new users and memberships
+    are inserted in a single transaction.
+    """
+    if current_user.role != userRole.TEACHER:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only teachers can import a roster."
+        )
+
+    group_exists = await db.scalar(
+        select(TeacherInsight.id).where(
+            TeacherInsight.id == group_id,
+            TeacherInsight.user_id == current_user.id
+        )
+    )
+    if not group_exists:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Group not found.")
+
+    rows = parse_roster(file.filename or "", await file.read())
+    if not rows:
+        raise HTTPException(status_code=400, detail="Roster is empty.")
+    if len(rows) > MAX_ROSTER_ROWS:
+        raise HTTPException(status_code=400, detail=f"Roster is limited to {MAX_ROSTER_ROWS} rows per import.")
+
+    # Validate every row; keep the first occurrence of each email
+    results = {}
+    entries = {}
+    for index, row in enumerate(rows, start=1):
+        try:
+            entry = RosterEntry(**row)
+        except (ValidationError, TypeError) as e:
+            message = e.errors()[0]["msg"] if isinstance(e, ValidationError) else "Invalid row"
+            results[index] = RosterRowResult(row=index, email=row.get("email"), status="error", detail=message)
+            continue
+        if entry.email in entries:
+            results[index] = RosterRowResult(row=index, email=entry.email, status="error", detail="Duplicate email in roster")
+            continue
+        entries[entry.email] = (index, entry)
+
+    # Existing accounts and their memberships, two queries for the whole roster
+    existing = {
+        user.email: user
+        for user in (
+            await db.execute(select(User.id, User.email, User.role).where(User.email.in_(list(entries))))
+        ).all()
+    }
+    already_members = set(
+        (
+            await db.scalars(
+                select(group_members.c.user_id).where(
+                    group_members.c.group_id == group_id,
+                    group_members.c.user_id.in_([user.id for user in existing.values()])
+                )
+            )
+        ).all()
+    )
+
+    new_members = []
+    to_create = []
+    for email, (index, entry) in entries.items():
+        user = existing.get(email)
+        if not user:
+            to_create.append((index, entry))
+        elif userRole(user.role) != userRole.STUDENT:
+            results[index] = RosterRowResult(row=index, email=email, status="error", detail="Account exists and is not a student")
+        elif user.id in already_members:
+            results[index] = RosterRowResult(row=index, email=email, status="already_member", user_id=user.id)
+        else:
+            new_members.append({"group_id": group_id, "user_id": user.id})
+            results[index] = RosterRowResult(row=index, email=email, status="added", user_id=user.id)
+
+    # Hash all new passwords in parallel, never queueing more than the pool has workers
+    passwords = [entry.password or secrets.token_urlsafe(9) for _, entry in to_create]
+    limiter = asyncio.Semaphore(password_hash_pool.workers)
+
+    async def hash_limited(password: str) -> str:
+        async with limiter:
+            return await hash_password_async(password)
+
+    hashed_passwords = await asyncio.gather(*(hash_limited(password) for password in passwords))
+
+    new_users = []
+    for (index, entry), password, hashed_password in zip(to_create, passwords, hashed_passwords):
+        user_id = str(uuid.uuid4())
+        new_users.append({
+            "id": user_id,
+            "full_name": entry.full_name,
+            "email": entry.email,
+            "role": userRole.STUDENT,
+            "hashed_password": hashed_password,
+        })
+        new_members.append({"group_id": group_id, "user_id": user_id})
+        results[index] = RosterRowResult(
+            row=index,
+            email=entry.email,
+            status="created",
+            user_id=user_id,
+            temporary_password=None if entry.password else password
+        )
+
+    # One transaction for every user and membership row
+    try:
+        if new_users:
+            await db.execute(insert(User), new_users)
+        if new_members:
+            await db.execute(insert(group_members), new_members)
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Roster conflicts with accounts created meanwhile; nothing was imported, please retry."
+        )
+
+    # Existing students now see the group's notes, docs and assignments
+    await invalidate_tags_async(*(user_tag(r.user_id) for r in results.values() if r.status == "added"))
+
+    ordered = [results[index] for index in sorted(results)]
+    counts = {status_name: sum(1 for r in ordered if r.status == status_name) for status_name in ("created", "added", "already_member", "error")}
+
+    return RosterImportResponse(
+        group_id=group_id,
+        created=counts["created"],
+        added=counts["added"],
+        already_member=counts["already_member"],
+        errors=counts["error"],
+        results=ordered
+    )
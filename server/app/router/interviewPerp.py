@@ -1,19 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import TypedDict, Annotated, Dict, List
 from app.schemas.interviewpreparation import InterviewPreparationCreate, InterviewPreparationResponse, InterviewPrepSubmit, InterviewResponse, InterviewPreparationCreateResponse
 from app.dependencies.dependencies import get_current_user
-from app.config.db import get_db
+from app.config.db import get_db, get_async_db
 from app.models.auth import User, userRole
 from dotenv import load_dotenv
 from langgraph.graph import add_messages, StateGraph, END
 from langchain_tavily import TavilySearch
-from langchain_google_genai import ChatGoogleGenerativeAI
+from app.utils.llm import get_llm
 from langchain_core.messages import HumanMessage, SystemMessage
 import json
 from app.models.InterviewPreparation import InterviewPrep
-from app.dependencies.redis_client import get_redis_client
-from fastapi.encoders import jsonable_encoder
+from app.dependencies.cache import cached, single_flight, invalidate_tags_async, owner_tag
+from app.utils.pagination import Page, page_params, paginate, finish_page
 
 load_dotenv()
 
@@ -25,11 +27,7 @@ class State(TypedDict):
 
 # ---- Tools & LLM ----
 search_tool = TavilySearch(max_results=2)
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    temperature=0,
-    response_format="json"  
-)
+llm = get_llm(temperature=0, response_format="json")
 
 # ---- Nodes ----
 def tavily_search_node(state: State):
@@ -106,6 +104,7 @@ graph = workflow.compile()
 router = APIRouter()
 
 @router.post("/create-interview-prep", response_model=InterviewPreparationCreateResponse)
+@single_flight("create-interview-prep", InterviewPreparationCreateResponse)
 def create_interview_prep(
     interview_prep: InterviewPreparationCreate,
     db: Session = Depends(get_db),
@@ -132,18 +131,16 @@ def create_interview_prep(
 
 
 @router.post("/submit-quiz")
-async def submit_quiz(submission: InterviewPreparationResponse, redis_client = Depends(get_redis_client), db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def submit_quiz(submission: InterviewPreparationResponse, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     if current_user.role != userRole.STUDENT:
         raise HTTPException(status_code=403, detail="Only students can submit quizzes.")
     
-    query = db.query(InterviewPrep).filter(InterviewPrep.user_id == current_user.id, InterviewPrep.name == submission.name).first()
+    query = await db.scalar(
+        select(InterviewPrep).where(InterviewPrep.user_id == current_user.id, InterviewPrep.name == submission.name)
+    )
     if query:
         raise HTTPException(status_code=400, detail="Quiz with this name already submitted.")
 
-    # Invalidate cache
-    cache_key = f"interview_preps:{current_user.id}"
-    redis_client.delete(cache_key)
-
     new_entry = InterviewPrep(
         name=submission.name,
         description=submission.description,
@@ -154,8 +151,9 @@ async def submit_quiz(submission: InterviewPreparationResponse, redis_client = D
     )
 
     db.add(new_entry)
-    db.commit()
-    db.refresh(new_entry)
+    await db.commit()
+    await db.refresh(new_entry)
+    await invalidate_tags_async(owner_tag("interview-preps", current_user.id))
 
     return {
         "message": "Quiz submitted successfully",
@@ -183,9 +181,11 @@ async def submit_quiz(submission: InterviewPreparationResponse, redis_client = D
 
 
 @router.get("/get-interview-preps", response_model=List[InterviewResponse])
-def get_interview_preps(
-    db: Session = Depends(get_db),
-    redis_client = Depends(get_redis_client),
+@cached("interview-preps", List[InterviewResponse], tags=lambda kw: [owner_tag("interview-preps", kw["current_user"].id)])
+async def get_interview_preps(
+    response: Response,
+    page: Page = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     # Role check
@@ -195,27 +195,10 @@ def get_interview_preps(
             detail="Only students can view their interview preparations."
         )
 
-    # Create unique cache key per user
-    cache_key = f"interview_preps:{current_user.id}"
-
-    # Try fetching from Redis
-    cached_data = redis_client.get(cache_key)
-    if cached_data:
-        data = json.loads(cached_data)
-        if isinstance(data, list) and all(isinstance(item, dict) for item in data):
-            return [InterviewResponse(**d) for d in data]
-        # If corrupted cache, delete it
-        redis_client.delete(cache_key)
-
-    # Fetch from DB
-    interview_preps = (
-        db.query(InterviewPrep)
-        .filter(InterviewPrep.user_id == current_user.id)
-        .all()
+    # Fetch from DB, newest first
+    query = select(InterviewPrep).where(InterviewPrep.user_id == current_user.id)
+    interview_preps = finish_page(
+        (await db.scalars(paginate(query, page, InterviewPrep.created_at, InterviewPrep.id))).all(), page, response
     )
 
-    # Encode and cache result for 2 minutes
-    encoded_data = jsonable_encoder(interview_preps)
-    redis_client.set(cache_key, json.dumps(encoded_data))
-
     return interview_preps
\ No newline at end of file
@@ -0,0 +1,68 @@
+from fastapi import APIRouter, Depends, HTTPException
+from app.config.db import pool_stats
+from app.config.log import logging_stats
+from app.config.metrics import N_PLUS_ONE_THRESHOLD, recent_query_stats
+from app.dependencies.redis_client import redis_stats
+from app.dependencies.tiered_cache import tiered_cache
+from app.utils.utils import password_hash_pool
+import os
+
+def _flag(name: str) -> bool:
+    return os.getenv(name, "").lower() in ("1", "true", "yes", "on")
+
+
+# Worker internals (pool sizes, breaker state, cache counters) are not public
+METRICS_ENABLED = _flag("METRICS_ENABLED")
+# Per-request SQL stats include statement text, so they need their own opt-in on top
+QUERY_STATS_DEBUG = _flag("QUERY_STATS_DEBUG")
+
+
+def require_metrics_enabled():
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+router = APIRouter(dependencies=[Depends(require_metrics_enabled)])
+
+
+@router.get("/db-pool")
+def get_db_pool_metrics():
+    """Connection pool usage and checkout wait times for this worker"""
+    return {"pools": pool_stats()}
+
+
+@router.get("/password-hashing")
+def get_password_hashing_metrics():
+    """Queue depth and wait/run times of the bcrypt worker pool on this worker"""
+    return password_hash_pool.snapshot()
+
+
+@router.get("/redis")
+def get_redis_metrics():
+    """Circuit breaker state, connection pool usage and the fallback cache counters"""
+    return redis_stats()
+
+
+@router.get("/cache")
+def get_cache_metrics():
+    """Whether this worker's L1 is active (invalidation listener connected) and its counters"""
+    return tiered_cache.stats()
+
+
+@router.get("/logging")
+def get_logging_metrics():
+    """Records waiting for the log writer thread and records dropped because it fell behind"""
+    return logging_stats()
+
+
+@router.get("/queries")
+def get_query_metrics(n_plus_one_only: bool = False, limit: int = 50):
+    """Statement counts, DB time and N+1 suspects for recent requests on this worker"""
+    if not QUERY_STATS_DEBUG:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    requests = recent_query_stats()
+    if n_plus_one_only:
+        requests = [r for r in requests if r["n_plus_one"]]
+    
+    return {"n_plus_one_threshold": N_PLUS_ONE_THRESHOLD, "requests": requests[:limit]}
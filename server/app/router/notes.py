@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Form
-from sqlalchemy.orm import Session
-from app.config.db import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Form
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload, defer, undefer
+from app.config.db import get_db, get_read_db
 from app.models.auth import User, userRole
 from app.models.teacherInsight import TeacherInsight
 from app.schemas.auth import UserResponse
@@ -9,6 +10,9 @@ from app.dependencies.dependencies import get_current_user
 from app.schemas.notes import NotesCreate, NotesResponse, EditNotes, NoteBaseResponse, TeacherNotesResponse
 from app.models.notes import Note
 from app.models.teacherInsight import TeacherInsight
+from app.utils.pagination import Page, bounded_page_params, paginate, finish_page, total_count
+from app.dependencies.cache import cached, invalidate_tags, group_tag, owner_tag
+from app.utils.conditional import check_not_modified, check_row_not_modified
 from datetime import datetime
 
 
@@ -50,12 +54,28 @@ def create_note(
     db.add(new_note)
     db.commit()
     db.refresh(new_note)
+    invalidate_tags(group_tag("notes", new_note.group_id), owner_tag("notes", current_user.id))
 
     return new_note
 
-@router.get("/teacher-get-notes", response_model=TeacherNotesResponse)
+def teacher_notes_not_modified(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    last_modified, count = (
+        db.query(func.max(Note.updated_at), func.count(Note.id)).filter(Note.owner_id == current_user.id).one()
+    )
+    check_not_modified(request, response, last_modified, count, current_user.id)
+
+
+@router.get("/teacher-get-notes", response_model=TeacherNotesResponse, dependencies=[Depends(teacher_notes_not_modified)])
+@cached("teacher-notes", TeacherNotesResponse, tags=lambda kw: [owner_tag("notes", kw["current_user"].id)])
 def get_teacher_notes(
-    db: Session = Depends(get_db),
+    response: Response,
+    page: Page = Depends(bounded_page_params()),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     # Ensure only teachers can access
@@ -65,18 +85,33 @@ def get_teacher_notes(
             detail="Not authorized to view notes"
         )
     
-    # Fetch teacher's notes
-    teacher_notes = db.query(Note).filter(Note.owner_id == current_user.id).all()
-    teacher_notes.sort(key=lambda x: x.created_at, reverse=True)
+    # Fetch teacher's notes, newest first
+    query = (
+        db.query(Note)
+        .options(
+            joinedload(Note.owner),
+            defer(Note.content),
+            undefer(Note.excerpt),
+            undefer(Note.content_size)
+        )
+        .filter(Note.owner_id == current_user.id)
+    )
+    teacher_notes = finish_page(paginate(query, page, Note.created_at, Note.id).all(), page, response)
 
     return {
-        "count": len(teacher_notes), 
+        "count": total_count(query, teacher_notes, page),
         "notes": teacher_notes      
     }
 
 
 @router.get("/{note_id}", response_model=NotesResponse)
-def get_note_by_id(note_id: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_note_by_id(
+    note_id: str,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
     if not current_user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
     
@@ -85,6 +120,7 @@ def get_note_by_id(note_id: str, db: Session = Depends(get_db), current_user: Us
     if not note:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Note not found")
     
+    check_row_not_modified(request, response, note.updated_at)
     return note
 
 
@@ -98,8 +134,10 @@ def delete_note(note_id: str, db: Session = Depends(get_db), current_user: User
     if not note:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Note not found or not owned by user")
     
+    group_id = note.group_id
     db.delete(note)
     db.commit()
+    invalidate_tags(group_tag("notes", group_id), owner_tag("notes", current_user.id))
 
     return {"message": "Note deleted successfully"}
 
@@ -130,5 +168,6 @@ def edit_note(
 
     db.commit()
     db.refresh(note)
+    invalidate_tags(group_tag("notes", note.group_id), owner_tag("notes", current_user.id))
 
     return note
\ No newline at end of file
@@ -1,13 +1,21 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy.orm.attributes import flag_modified
-from sqlalchemy import func, and_
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+from sqlalchemy import func, and_, select, update
 from typing import List
 from datetime import datetime, timezone
+import logging
 
 from app.models.auth import User
 from app.models.teachSession import TeachSession
-from app.models.peerLearning import PeerLearningSession, PeerSessionMessage, PeerSessionRating, PeerWhiteboardData
+from app.models.peerLearning import (
+    PeerLearningSession,
+    PeerSessionEnrollment,
+    PeerSessionMessage,
+    PeerSessionRating,
+    PeerWhiteboardData
+)
 from app.schemas.peerLearning import (
     PeerLearningSessionCreate,
     PeerLearningSessionResponse,
@@ -24,29 +32,45 @@ from app.schemas.peerLearning import (
     PeerWhiteboardDataResponse
 )
 from app.dependencies.dependencies import get_current_user
-from app.config.db import get_db
+from app.dependencies.principal import invalidate_principal
+from app.config.db import get_async_db, get_async_read_db
+from app.utils.pagination import Page, bounded_page_params, page_params, paginate, finish_page
+from app.utils.conditional import check_not_modified
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Available sessions were capped at 20 before cursor paging; a plain request still is
+SESSION_PAGE_SIZE = 20
 
 # Minimum score required to create a peer learning session (80%)
 MIN_SCORE_THRESHOLD = 80
 COINS_PER_STUDENT = 10  # Coins earned per student enrolled
 
 
+async def is_enrolled(db: AsyncSession, session_id: str, student_id: str) -> bool:
+    """Check enrollment with a primary-key lookup on peer_session_enrollments"""
+    return await db.get(PeerSessionEnrollment, (session_id, student_id)) is not None
+
+
 @router.post("/sessions", response_model=PeerLearningSessionResponse)
 async def create_peer_learning_session(
     session_data: PeerLearningSessionCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new peer learning session as a qualified teacher (requires 80%+ in any teach session)"""
     if not current_user:
         raise HTTPException(status_code=401, detail="Unauthorized")
     
     # Check if user has ANY teach session with 80%+ average score
-    user_sessions = db.query(TeachSession).filter(
-        TeachSession.student_id == current_user.id,
-        TeachSession.status == "completed"
+    user_sessions = (
+        await db.scalars(
+            select(TeachSession).where(
+                TeachSession.student_id == current_user.id,
+                TeachSession.status == "completed"
+            )
+        )
     ).all()
     
     # Find the best score
@@ -80,117 +104,161 @@ async def create_peer_learning_session(
     )
     
     db.add(new_peer_session)
-    db.commit()
-    db.refresh(new_peer_session)
+    await db.commit()
+    await db.refresh(new_peer_session)
     
     # Prepare response
     response = PeerLearningSessionResponse(
         **new_peer_session.__dict__,
         teacher_name=current_user.full_name,
-        enrolled_count=len(new_peer_session.enrolled_student_ids)
+        enrolled_student_ids=[]
     )
     
     return response
 
 
-@router.get("/sessions", response_model=List[PeerLearningSessionResponse])
+async def peer_sessions_not_modified(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_current_user),
+    status: str = None
+):
+    # Depending on get_current_user makes auth run first. The list is the same for
+    # every user, so the validators themselves are global
+    validators = select(func.max(PeerLearningSession.updated_at), func.count(PeerLearningSession.id)).where(
+        PeerLearningSession.status.in_(["waiting", "active"])
+    )
+    if status:
+        validators = validators.where(PeerLearningSession.status == status)
+    last_modified, count = (await db.execute(validators)).one()
+    check_not_modified(request, response, last_modified, count)
+
+
+@router.get("/sessions", response_model=List[PeerLearningSessionResponse], dependencies=[Depends(peer_sessions_not_modified)])
 async def get_available_peer_sessions(
+    response: Response,
+    page: Page = Depends(bounded_page_params(SESSION_PAGE_SIZE)),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-    status: str = None,  # Changed from "waiting" to None to show all by default
-    skip: int = 0,
-    limit: int = 20
+    db: AsyncSession = Depends(get_async_read_db),
+    status: str = None  # Changed from "waiting" to None to show all by default
 ):
     """Get all available peer learning sessions (waiting for students or active)"""
     if not current_user:
         raise HTTPException(status_code=401, detail="Unauthorized")
     
-    import logging
-    logger = logging.getLogger(__name__)
-    logger.info(f"=== Fetching peer sessions for user: {current_user.email} ===")
-    logger.info(f"Status filter: {status}")
-    
     # Query peer sessions - exclude completed sessions by default
-    query = db.query(PeerLearningSession).filter(
+    query = select(PeerLearningSession).where(
         PeerLearningSession.status.in_(["waiting", "active"])
     )
     
     # Allow additional filtering if status is specified
     if status:
-        query = query.filter(PeerLearningSession.status == status)
-    
-    sessions = query.order_by(
-        PeerLearningSession.created_at.desc()
-    ).offset(skip).limit(limit).all()
+        query = query.where(PeerLearningSession.status == status)
     
-    logger.info(f"Found {len(sessions)} sessions")
-    for s in sessions:
-        logger.info(f"  - Session ID: {s.id}, Title: {s.title}, Teacher: {s.teacher_user_id}, Status: {s.status}")
+    query = query.options(joinedload(PeerLearningSession.teacher))
+    sessions = (
+        await db.scalars(paginate(query, page, PeerLearningSession.created_at, PeerLearningSession.id))
+    ).all()
+    sessions = finish_page(sessions, page, response)
     
     # Enrich with teacher info
     enriched_sessions = []
     for session in sessions:
-        teacher = db.query(User).filter(User.id == session.teacher_user_id).first()
-        
         response = PeerLearningSessionResponse(
             **session.__dict__,
-            teacher_name=teacher.full_name if teacher else "Unknown",
-            enrolled_count=len(session.enrolled_student_ids)
+            teacher_name=session.teacher.full_name if session.teacher else "Unknown"
         )
         enriched_sessions.append(response)
     
-    logger.info(f"Returning {len(enriched_sessions)} enriched sessions")
+    logger.debug("Peer sessions listed", extra={"user_id": current_user.id, "status_filter": status, "count": len(enriched_sessions)})
     return enriched_sessions
 
 
 @router.get("/sessions/my-teachings", response_model=List[PeerLearningSessionResponse])
 async def get_my_peer_teaching_sessions(
+    response: Response,
+    page: Page = Depends(page_params),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get all peer sessions where current user is the teacher"""
     if not current_user:
         raise HTTPException(status_code=401, detail="Unauthorized")
     
-    sessions = db.query(PeerLearningSession).filter(
-        PeerLearningSession.teacher_user_id == current_user.id
-    ).order_by(PeerLearningSession.created_at.desc()).all()
+    query = select(PeerLearningSession).where(PeerLearningSession.teacher_user_id == current_user.id)
+    sessions = (
+        await db.scalars(paginate(query, page, PeerLearningSession.created_at, PeerLearningSession.id))
+    ).all()
+    sessions = finish_page(sessions, page, response)
     
     enriched_sessions = []
     for session in sessions:
         response = PeerLearningSessionResponse(
             **session.__dict__,
-            teacher_name=current_user.full_name,
-            enrolled_count=len(session.enrolled_student_ids)
+            teacher_name=current_user.full_name
         )
         enriched_sessions.append(response)
     
     return enriched_sessions
 
 
+@router.get("/sessions/my-enrollments", response_model=List[PeerLearningSessionResponse])
+async def get_my_enrolled_peer_sessions(
+    response: Response,
+    page: Page = Depends(page_params),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Get all peer sessions the current user is enrolled in as a student"""
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    
+    query = (
+        select(PeerLearningSession, User.full_name)
+        .join(PeerSessionEnrollment, PeerSessionEnrollment.peer_session_id == PeerLearningSession.id)
+        .outerjoin(User, User.id == PeerLearningSession.teacher_user_id)
+        .where(PeerSessionEnrollment.student_id == current_user.id)
+    )
+    rows = (
+        await db.execute(paginate(query, page, PeerLearningSession.created_at, PeerLearningSession.id))
+    ).all()
+    rows = finish_page(rows, page, response, key=lambda row: (row[0].created_at, row[0].id))
+    
+    return [
+        PeerLearningSessionResponse(**session.__dict__, teacher_name=teacher_name or "Unknown")
+        for session, teacher_name in rows
+    ]
+
+
 @router.get("/sessions/{session_id}", response_model=PeerLearningSessionResponse)
 async def get_peer_session_by_id(
     session_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific peer learning session"""
     if not current_user:
         raise HTTPException(status_code=401, detail="Unauthorized")
     
-    session = db.query(PeerLearningSession).filter(
-        PeerLearningSession.id == session_id
-    ).first()
+    session = await db.get(PeerLearningSession, session_id)
     
     if not session:
         raise HTTPException(status_code=404, detail="Peer session not found")
     
-    teacher = db.query(User).filter(User.id == session.teacher_user_id).first()
+    teacher = await db.get(User, session.teacher_user_id)
+    enrolled_student_ids = (
+        await db.scalars(
+            select(PeerSessionEnrollment.student_id)
+            .where(PeerSessionEnrollment.peer_session_id == session_id)
+            .order_by(PeerSessionEnrollment.enrolled_at)
+        )
+    ).all()
     
     response = PeerLearningSessionResponse(
         **session.__dict__,
         teacher_name=teacher.full_name if teacher else "Unknown",
-        enrolled_count=len(session.enrolled_student_ids)
+        enrolled_student_ids=list(enrolled_student_ids)
     )
     
     return response
@@ -200,15 +268,13 @@ async def get_peer_session_by_id(
 async def enroll_in_peer_session(
     session_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Enroll in a peer learning session"""
     if not current_user:
         raise HTTPException(status_code=401, detail="Unauthorized")
     
-    session = db.query(PeerLearningSession).filter(
-        PeerLearningSession.id == session_id
-    ).first()
+    session = await db.get(PeerLearningSession, session_id)
     
     if not session:
         raise HTTPException(status_code=404, detail="Peer session not found")
@@ -221,25 +287,36 @@ async def enroll_in_peer_session(
     if session.teacher_user_id == current_user.id:
         raise HTTPException(status_code=400, detail="You cannot enroll in your own session")
     
-    # Check if already enrolled
-    if current_user.id in session.enrolled_student_ids:
+    # Enroll the student; the primary key rejects duplicate enrollments
+    db.add(PeerSessionEnrollment(peer_session_id=session_id, student_id=current_user.id))
+    try:
+        await db.flush()
+    except IntegrityError:
+        await db.rollback()
         raise HTTPException(status_code=400, detail="You are already enrolled in this session")
     
-    # Check if session is full
-    if len(session.enrolled_student_ids) >= session.max_students:
+    # Claim a seat atomically so concurrent enrollments cannot overfill the session.
+    # The first student to join also auto-starts the session.
+    seat = await db.scalar(
+        update(PeerLearningSession)
+        .where(
+            PeerLearningSession.id == session_id,
+            PeerLearningSession.status.in_(["waiting", "active"]),
+            PeerLearningSession.enrolled_count < PeerLearningSession.max_students
+        )
+        .values(
+            enrolled_count=PeerLearningSession.enrolled_count + 1,
+            status="active",
+            started_at=func.coalesce(PeerLearningSession.started_at, datetime.utcnow())
+        )
+        .returning(PeerLearningSession.enrolled_count)
+        .execution_options(synchronize_session=False)
+    )
+    if seat is None:
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Session is full")
     
-    # Enroll the student
-    session.enrolled_student_ids.append(current_user.id)
-    flag_modified(session, "enrolled_student_ids")
-    
-    # Auto-start session when first student joins
-    if len(session.enrolled_student_ids) == 1:
-        session.status = "active"
-        session.started_at = datetime.now(timezone.utc)
-    
-    db.commit()
-    db.refresh(session)
+    await db.commit()
     
     return EnrollResponse(
         message="Successfully enrolled in peer learning session",
@@ -252,15 +329,13 @@ async def enroll_in_peer_session(
 async def start_peer_session(
     session_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Manually start a peer learning session (teacher only)"""
     if not current_user:
         raise HTTPException(status_code=401, detail="Unauthorized")
     
-    session = db.query(PeerLearningSession).filter(
-        PeerLearningSession.id == session_id
-    ).first()
+    session = await db.get(PeerLearningSession, session_id)
     
     if not session:
         raise HTTPException(status_code=404, detail="Peer session not found")
@@ -272,19 +347,19 @@ async def start_peer_session(
     if session.status != "waiting":
         raise HTTPException(status_code=400, detail="Session is not in waiting state")
     
-    if len(session.enrolled_student_ids) == 0:
+    if session.enrolled_count == 0:
         raise HTTPException(status_code=400, detail="No students enrolled yet")
     
     session.status = "active"
-    session.started_at = datetime.now(timezone.utc)
+    session.started_at = datetime.utcnow()
     
-    db.commit()
+    await db.commit()
     
     return {
         "message": "Peer learning session started",
         "session_id": session_id,
         "status": "active",
-        "enrolled_count": len(session.enrolled_student_ids)
+        "enrolled_count": session.enrolled_count
     }
 
 
@@ -292,15 +367,13 @@ async def start_peer_session(
 async def end_peer_session(
     session_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """End a peer learning session and award coins (teacher only)"""
     if not current_user:
         raise HTTPException(status_code=401, detail="Unauthorized")
     
-    session = db.query(PeerLearningSession).filter(
-        PeerLearningSession.id == session_id
-    ).first()
+    session = await db.get(PeerLearningSession, session_id)
     
     if not session:
         raise HTTPException(status_code=404, detail="Peer session not found")
@@ -316,17 +389,20 @@ async def end_peer_session(
     session.ended_at = datetime.now(timezone.utc)
     
     # Award coins to teacher based on number of students taught
-    num_students = len(session.enrolled_student_ids)
+    num_students = session.enrolled_count
     coins_awarded = num_students * COINS_PER_STUDENT
     
     # Update teacher's coins in database
-    teacher = db.query(User).filter(User.id == session.teacher_user_id).first()
+    teacher = await db.get(User, session.teacher_user_id)
     if teacher:
         teacher.coins = (teacher.coins or 0) + coins_awarded
     
     session.coins_earned = coins_awarded
     
-    db.commit()
+    await db.commit()
+    
+    if teacher:
+        invalidate_principal(teacher.email)
     
     return {
         "message": "Peer learning session completed",
@@ -340,35 +416,43 @@ async def end_peer_session(
 @router.get("/sessions/{session_id}/messages", response_model=List[PeerMessageResponse])
 async def get_peer_session_messages(
     session_id: str,
+    response: Response,
+    page: Page = Depends(page_params),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all messages in a peer learning session"""
     if not current_user:
         raise HTTPException(status_code=401, detail="Unauthorized")
     
-    session = db.query(PeerLearningSession).filter(
-        PeerLearningSession.id == session_id
-    ).first()
+    session = await db.get(PeerLearningSession, session_id)
     
     if not session:
         raise HTTPException(status_code=404, detail="Peer session not found")
     
     # Check if user is teacher or enrolled student
-    if session.teacher_user_id != current_user.id and current_user.id not in session.enrolled_student_ids:
+    if session.teacher_user_id != current_user.id and not await is_enrolled(db, session_id, current_user.id):
         raise HTTPException(status_code=403, detail="You are not a participant in this session")
     
-    messages = db.query(PeerSessionMessage).filter(
-        PeerSessionMessage.peer_session_id == session_id
-    ).order_by(PeerSessionMessage.created_at).all()
+    # Oldest first; follow the cursor header for later messages
+    query = (
+        select(PeerSessionMessage)
+        .options(joinedload(PeerSessionMessage.sender))
+        .where(PeerSessionMessage.peer_session_id == session_id)
+    )
+    messages = (
+        await db.scalars(
+            paginate(query, page, PeerSessionMessage.created_at, PeerSessionMessage.id, descending=False)
+        )
+    ).all()
+    messages = finish_page(messages, page, response)
     
     # Enrich with sender names
     enriched_messages = []
     for msg in messages:
-        sender = db.query(User).filter(User.id == msg.sender_id).first()
         response = PeerMessageResponse(
             **msg.__dict__,
-            sender_name=sender.full_name if sender else "Unknown"
+            sender_name=msg.sender.full_name if msg.sender else "Unknown"
         )
         enriched_messages.append(response)
     
@@ -380,15 +464,13 @@ async def send_peer_message(
     session_id: str,
     message_data: PeerMessageCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Send a message in a peer learning session"""
     if not current_user:
         raise HTTPException(status_code=401, detail="Unauthorized")
     
-    session = db.query(PeerLearningSession).filter(
-        PeerLearningSession.id == session_id
-    ).first()
+    session = await db.get(PeerLearningSession, session_id)
     
     if not session:
         raise HTTPException(status_code=404, detail="Peer session not found")
@@ -396,7 +478,7 @@ async def send_peer_message(
     # Determine sender role
     if session.teacher_user_id == current_user.id:
         sender_role = "teacher"
-    elif current_user.id in session.enrolled_student_ids:
+    elif await is_enrolled(db, session_id, current_user.id):
         sender_role = "student"
     else:
         raise HTTPException(status_code=403, detail="You are not a participant in this session")
@@ -412,8 +494,8 @@ async def send_peer_message(
     )
     
     db.add(new_message)
-    db.commit()
-    db.refresh(new_message)
+    await db.commit()
+    await db.refresh(new_message)
     
     # Return full message with sender name
     return PeerMessageResponse(
@@ -427,38 +509,38 @@ async def rate_peer_session(
     session_id: str,
     rating_data: RatingCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Rate and provide feedback for a peer learning session"""
     if not current_user:
         raise HTTPException(status_code=401, detail="Unauthorized")
     
-    session = db.query(PeerLearningSession).filter(
-        PeerLearningSession.id == session_id
-    ).first()
+    session = await db.get(PeerLearningSession, session_id)
     
     if not session:
         raise HTTPException(status_code=404, detail="Peer session not found")
     
     # Check if user is enrolled
-    if current_user.id not in session.enrolled_student_ids:
+    if not await is_enrolled(db, session_id, current_user.id):
         raise HTTPException(status_code=403, detail="Only enrolled students can rate this session")
     
     # Check if user already rated this session
-    existing_rating = db.query(PeerSessionRating).filter(
-        and_(
-            PeerSessionRating.peer_session_id == session_id,
-            PeerSessionRating.student_id == current_user.id
+    existing_rating = await db.scalar(
+        select(PeerSessionRating).where(
+            and_(
+                PeerSessionRating.peer_session_id == session_id,
+                PeerSessionRating.student_id == current_user.id
+            )
         )
-    ).first()
+    )
     
     if existing_rating:
         # Update existing rating
         existing_rating.rating = rating_data.rating
         existing_rating.feedback = rating_data.feedback
         existing_rating.upvoted = 1 if rating_data.upvoted else 0
-        db.commit()
-        db.refresh(existing_rating)
+        await db.commit()
+        await db.refresh(existing_rating)
         new_rating = existing_rating
     else:
         # Create new rating
@@ -470,12 +552,14 @@ async def rate_peer_session(
             upvoted=1 if rating_data.upvoted else 0
         )
         db.add(new_rating)
-        db.commit()
-        db.refresh(new_rating)
+        await db.commit()
+        await db.refresh(new_rating)
     
     # Recalculate session average rating and upvotes
-    all_ratings = db.query(PeerSessionRating).filter(
-        PeerSessionRating.peer_session_id == session_id
+    all_ratings = (
+        await db.scalars(
+            select(PeerSessionRating).where(PeerSessionRating.peer_session_id == session_id)
+        )
     ).all()
     
     total_ratings = len(all_ratings)
@@ -486,7 +570,7 @@ async def rate_peer_session(
     session.total_ratings = total_ratings
     session.upvotes = total_upvotes
     
-    db.commit()
+    await db.commit()
     
     return RatingResponse(**new_rating.__dict__)
 
@@ -494,19 +578,21 @@ async def rate_peer_session(
 @router.get("/stats", response_model=PeerSessionStats)
 async def get_peer_teaching_stats(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get statistics for peer teaching sessions"""
     if not current_user:
         raise HTTPException(status_code=401, detail="Unauthorized")
     
-    sessions = db.query(PeerLearningSession).filter(
-        PeerLearningSession.teacher_user_id == current_user.id
+    sessions = (
+        await db.scalars(
+            select(PeerLearningSession).where(PeerLearningSession.teacher_user_id == current_user.id)
+        )
     ).all()
     
     total_sessions = len(sessions)
     total_coins = sum(s.coins_earned for s in sessions)
-    total_students = sum(len(s.enrolled_student_ids) for s in sessions)
+    total_students = sum(s.enrolled_count for s in sessions)
     
     # Calculate average rating across all sessions
     rated_sessions = [s for s in sessions if s.total_ratings > 0]
@@ -524,16 +610,18 @@ async def get_peer_teaching_stats(
 async def delete_peer_session(
     session_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a peer learning session (only by teacher before it starts)"""
     if not current_user:
         raise HTTPException(status_code=401, detail="Unauthorized")
     
-    session = db.query(PeerLearningSession).filter(
-        PeerLearningSession.id == session_id,
-        PeerLearningSession.teacher_user_id == current_user.id
-    ).first()
+    session = await db.scalar(
+        select(PeerLearningSession).where(
+            PeerLearningSession.id == session_id,
+            PeerLearningSession.teacher_user_id == current_user.id
+        )
+    )
     
     if not session:
         raise HTTPException(status_code=404, detail="Peer session not found")
@@ -543,13 +631,17 @@ async def delete_peer_session(
         raise HTTPException(status_code=400, detail="Cannot delete a session that has started")
     
     # Refund coins to teacher if any were awarded
+    teacher = None
     if session.coins_earned > 0:
-        teacher = db.query(User).filter(User.id == session.teacher_user_id).first()
+        teacher = await db.get(User, session.teacher_user_id)
         if teacher:
             teacher.coins = max(0, (teacher.coins or 0) - session.coins_earned)
     
-    db.delete(session)
-    db.commit()
+    await db.delete(session)
+    await db.commit()
+    
+    if teacher:
+        invalidate_principal(teacher.email)
     
     return {"message": "Peer session deleted successfully"}
 
@@ -561,25 +653,22 @@ async def save_peer_whiteboard_data(
     session_id: str,
     whiteboard_data: PeerWhiteboardDataCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Save whiteboard drawing data for a peer learning session"""
     if not current_user:
         raise HTTPException(status_code=401, detail="Unauthorized")
     
     # Check if session exists and user is a participant (teacher or enrolled student)
-    session = db.query(PeerLearningSession).filter(
-        PeerLearningSession.id == session_id
-    ).first()
+    session = await db.get(PeerLearningSession, session_id)
     
     if not session:
         raise HTTPException(status_code=404, detail="Peer session not found")
     
     # Verify user is the teacher or an enrolled student
     is_teacher = session.teacher_user_id == current_user.id
-    is_enrolled = current_user.id in session.enrolled_student_ids
     
-    if not is_teacher and not is_enrolled:
+    if not is_teacher and not await is_enrolled(db, session_id, current_user.id):
         raise HTTPException(status_code=403, detail="You are not a participant in this session")
     
     # Create whiteboard entry
@@ -591,8 +680,8 @@ async def save_peer_whiteboard_data(
     )
     
     db.add(wb_data)
-    db.commit()
-    db.refresh(wb_data)
+    await db.commit()
+    await db.refresh(wb_data)
     
     return wb_data
 
@@ -601,30 +690,31 @@ async def save_peer_whiteboard_data(
 async def get_peer_whiteboard_data(
     session_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all whiteboard data for a peer learning session"""
     if not current_user:
         raise HTTPException(status_code=401, detail="Unauthorized")
     
     # Check if session exists and user is a participant
-    session = db.query(PeerLearningSession).filter(
-        PeerLearningSession.id == session_id
-    ).first()
+    session = await db.get(PeerLearningSession, session_id)
     
     if not session:
         raise HTTPException(status_code=404, detail="Peer session not found")
     
     # Verify user is the teacher or an enrolled student
     is_teacher = session.teacher_user_id == current_user.id
-    is_enrolled = current_user.id in session.enrolled_student_ids
     
-    if not is_teacher and not is_enrolled:
+    if not is_teacher and not await is_enrolled(db, session_id, current_user.id):
         raise HTTPException(status_code=403, detail="You are not a participant in this session")
     
     # Get whiteboard data
-    whiteboard_data = db.query(PeerWhiteboardData).filter(
-        PeerWhiteboardData.peer_session_id == session_id
-    ).order_by(PeerWhiteboardData.created_at).all()
+    whiteboard_data = (
+        await db.scalars(
+            select(PeerWhiteboardData)
+            .where(PeerWhiteboardData.peer_session_id == session_id)
+            .order_by(PeerWhiteboardData.created_at)
+        )
+    ).all()
     
     return whiteboard_data
@@ -1,18 +1,20 @@
 from fastapi import APIRouter, Depends, status, Form, File, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import TypedDict, Annotated, Dict, List
 from app.schemas.studentInsight import StudentInsightResponse, StudentInsightCreate
 from app.dependencies.dependencies import get_current_user
-from app.config.db import get_db
+from app.config.db import get_db, get_async_db
 from app.models.auth import User, userRole
 from app.schemas.auth import UserResponse
 from app.models.studentInsight import StudentInsight
 from dotenv import load_dotenv
 from langgraph.graph import add_messages, StateGraph, END
 from langchain_tavily import TavilySearch
-from langchain_google_genai import ChatGoogleGenerativeAI
+from app.utils.llm import get_llm
 from langchain_core.messages import HumanMessage, SystemMessage
-from app.dependencies.redis_client import get_redis_client
+from app.dependencies.cache import cached, single_flight, invalidate_tags, owner_tag
 import json
 from datetime import datetime
 
@@ -28,9 +30,7 @@ class State(TypedDict):
 
 search_tool = TavilySearch(max_results=2)
 
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash", temperature=0, response_format="json"
-)
+llm = get_llm(temperature=0, response_format="json")
 
 
 def tavily_search_node(state: State):
@@ -106,6 +106,7 @@ router = APIRouter()
 
 
 @router.post("/generate-industry-insight", response_model=StudentInsightResponse)
+@single_flight("generate-industry-insight", StudentInsightResponse)
 def generate_industry_insight(
     industry: str = Form(..., description="The industry to generate insights for."),
     current_user: User = Depends(get_current_user),
@@ -159,15 +160,16 @@ def generate_industry_insight(
         raise HTTPException(
             status_code=500, detail=f"Failed to save industry insights: {str(e)}"
         )
+    invalidate_tags(owner_tag("student-insights", current_user.id))
 
     return new_insight
 
 
 @router.get("/my-insights", response_model=StudentInsightResponse)
-def get_my_insights(
+@cached("student-insights", StudentInsightResponse, tags=lambda kw: [owner_tag("student-insights", kw["current_user"].id)], ttl=3600)
+async def get_my_insights(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-    redis_client = Depends(get_redis_client)
+    db: AsyncSession = Depends(get_async_db)
 ):
     if current_user.role != userRole.STUDENT:
         raise HTTPException(
@@ -175,16 +177,8 @@ def get_my_insights(
             detail="Only students can access their industry insights.",
         )
     
-    cache_key = f"student_insights:{current_user.id}"
-
-    cached_data = redis_client.get(cache_key)
-    if cached_data:
-        return json.loads(cached_data)
-
-    insights = (
-        db.query(StudentInsight)
-        .filter(StudentInsight.user_id == current_user.id)
-        .first()
+    insights = await db.scalar(
+        select(StudentInsight).where(StudentInsight.user_id == current_user.id).limit(1)
     )
 
     if not insights:
@@ -193,13 +187,4 @@ def get_my_insights(
             detail="No industry insights found for the current user.",
         )
     
-    insights_data = StudentInsightResponse.from_orm(insights).dict()
-    if not insights_data:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="No industry insights found for the current user.",
-        )
-    
-    redis_client.set(cache_key, json.dumps(insights_data, default=str), ex=3600)  
-
-    return insights_data
+    return insights
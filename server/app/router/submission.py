@@ -1,22 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Form, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Form, Query
 from sqlalchemy.orm import Session , joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from datetime import datetime
+import logging
 from app.models.assignment import Assignment, AssignmentQuestion, Submission
 from app.models.auth import User, group_members
 from app.schemas.auth import UserResponse
 from app.models.auth import userRole
-from app.dependencies.dependencies import get_db, get_current_user
-from sqlalchemy import extract, func
+from app.dependencies.dependencies import get_async_db, get_read_db, get_async_read_db, get_current_user
+from sqlalchemy import extract, func, select
+from app.utils.pagination import Page, page_params, paginate, finish_page
+from app.dependencies.cache import cached, add_cache_tags, user_tag, group_tag, owner_tag
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 @router.get("/student-view/{assignment_id}")
-async def get_submissions(assignment_id: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def get_submissions(assignment_id: str, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     if current_user.role != userRole.STUDENT:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view submissions")
     
-    submissions = db.query(Submission).filter(Submission.assignment_id == assignment_id, Submission.student_id == current_user.id).all()
+    submissions = (
+        await db.scalars(
+            select(Submission).where(Submission.assignment_id == assignment_id, Submission.student_id == current_user.id)
+        )
+    ).all()
 
     if not submissions:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No submissions found for this assignment")
@@ -28,7 +37,7 @@ async def get_submissions(assignment_id: str, db: Session = Depends(get_db), cur
 @router.get("/assignment-stats/{assignment_id}")
 async def assignment_stats(
     assignment_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     # Only teachers can view
@@ -36,7 +45,11 @@ async def assignment_stats(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
 
     # Get the assignment and its group
-    assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
+    assignment = await db.scalar(
+        select(Assignment)
+        .where(Assignment.id == assignment_id)
+        .options(joinedload(Assignment.group))
+    )
     if not assignment:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Assignment not found")
 
@@ -44,12 +57,14 @@ async def assignment_stats(
     if not group:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Group not found for this assignment")
 
-    total_students = len(group.members)
+    total_students = await db.scalar(
+        select(func.count()).select_from(group_members).where(group_members.c.group_id == group.id)
+    )
 
     # Count students who submitted
-    students_completed = db.query(Submission).filter(
-        Submission.assignment_id == assignment_id
-    ).count()
+    students_completed = await db.scalar(
+        select(func.count(Submission.id)).where(Submission.assignment_id == assignment_id)
+    )
 
     return {
         "assignment_id": assignment_id,
@@ -62,7 +77,7 @@ async def assignment_stats(
 @router.get("/assignment-marks/{assignment_id}")
 async def get_assignment_marks(
     assignment_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     # Only teachers or authorized users
@@ -70,11 +85,10 @@ async def get_assignment_marks(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
 
     # Fetch assignment
-    assignment = (
-        db.query(Assignment)
+    assignment = await db.scalar(
+        select(Assignment)
         .options(joinedload(Assignment.group))
-        .filter(Assignment.id == assignment_id)
-        .first()
+        .where(Assignment.id == assignment_id)
     )
     if not assignment:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Assignment not found")
@@ -85,12 +99,13 @@ async def get_assignment_marks(
 
     # Fetch only submissions for this assignment
     submissions = (
-        db.query(Submission)
-        .join(User, Submission.student_id == User.id)
-        .filter(Submission.assignment_id == assignment_id)
-        .options(joinedload(Submission.student))
-        .all()
-    )
+        await db.scalars(
+            select(Submission)
+            .join(User, Submission.student_id == User.id)
+            .where(Submission.assignment_id == assignment_id)
+            .options(joinedload(Submission.student))
+        )
+    ).all()
 
     # Prepare response
     result = [
@@ -115,24 +130,16 @@ async def get_assignment_marks(
 
 @router.get("/total-submissions")
 async def total_submissions(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(get_current_user),
 ):
     if not current_user or current_user.role != userRole.TEACHER:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
 
-    assignments = (
-        db.query(Assignment)
-        .filter(Assignment.owner_id == current_user.id)
-        .all()
-    )
-
-    assignment_ids = [assignment.id for assignment in assignments]
+    assignment_ids = select(Assignment.id).where(Assignment.owner_id == current_user.id)
 
-    total_submissions = (
-        db.query(Submission)
-        .filter(Submission.assignment_id.in_(assignment_ids))
-        .count()
+    total_submissions = await db.scalar(
+        select(func.count(Submission.id)).where(Submission.assignment_id.in_(assignment_ids))
     )
 
     return {
@@ -142,28 +149,30 @@ async def total_submissions(
 
 
 @router.get("/student-submissions-stats")
-async def student_submissions_stats(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def student_submissions_stats(db: AsyncSession = Depends(get_async_read_db), current_user: User = Depends(get_current_user)):
     if not current_user or current_user.role != userRole.STUDENT:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
     
     submissions = (
-        db.query(Submission)
-        .filter(Submission.student_id == current_user.id)
-        .order_by(Submission.submitted_at.asc())
-        .all()
-    )
+        await db.scalars(
+            select(Submission)
+            .where(Submission.student_id == current_user.id)
+            .order_by(Submission.submitted_at.asc())
+        )
+    ).all()
 
     if not submissions:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No submissions found for this student")
     
     completion_stats = (
-        db.query(func.date(Submission.submitted_at).label("date"),
-                 func.count(Submission.id).label("count"))
-        .filter(Submission.student_id == current_user.id)
-        .group_by(func.date(Submission.submitted_at))
-        .order_by(func.date(Submission.submitted_at).asc())
-        .all()
-    )
+        await db.execute(
+            select(func.date(Submission.submitted_at).label("date"),
+                   func.count(Submission.id).label("count"))
+            .where(Submission.student_id == current_user.id)
+            .group_by(func.date(Submission.submitted_at))
+            .order_by(func.date(Submission.submitted_at).asc())
+        )
+    ).all()
 
     completion_over_time = [
         {"date": str(record.date), "count": record.count} for record in completion_stats
@@ -177,9 +186,17 @@ async def student_submissions_stats(db: Session = Depends(get_db), current_user:
 
 
 
+# Short TTL: is_past_due is computed at request time
 @router.get("/student/assignments")
+@cached(
+    "student-assignments",
+    tags=lambda kw: [user_tag(kw["current_user"].id), owner_tag("submissions", kw["current_user"].id)],
+    ttl=60
+)
 def get_student_assignments(
-    db: Session = Depends(get_db),
+    response: Response,
+    page: Page = Depends(page_params),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     # Only allow students
@@ -187,24 +204,35 @@ def get_student_assignments(
         raise HTTPException(status_code=403, detail="Only students can access this route")
 
     # Get all groups where the student is a member
-    groups = current_user.groups
-    group_ids = [group.id for group in groups]
+    group_ids = [
+        row.group_id
+        for row in db.query(group_members.c.group_id).filter(group_members.c.user_id == current_user.id)
+    ]
 
     if not group_ids:
         return {"assignments": []}
+    add_cache_tags(*(group_tag("assignments", group_id) for group_id in group_ids))
 
-    # Fetch all assignments belonging to student's groups
-    assignments = (
+    # Fetch assignments belonging to student's groups, latest due date first
+    query = (
         db.query(Assignment)
+        .options(joinedload(Assignment.group))
         .filter(Assignment.group_id.in_(group_ids))
-        .order_by(Assignment.due_date.desc())
-        .all()
+    )
+    assignments = finish_page(
+        paginate(query, page, Assignment.due_date, Assignment.id).all(),
+        page,
+        response,
+        key=lambda a: (a.due_date, a.id)
     )
 
-    # Fetch all student's submissions
+    # Fetch the student's submissions for this page of assignments
     student_submissions = (
         db.query(Submission)
-        .filter(Submission.student_id == current_user.id)
+        .filter(
+            Submission.student_id == current_user.id,
+            Submission.assignment_id.in_([a.id for a in assignments])
+        )
         .all()
     )
 
@@ -230,7 +258,7 @@ def get_student_assignments(
 
 @router.get("/student-performance-stats")
 def get_student_performance_stats(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     try:
@@ -238,21 +266,18 @@ def get_student_performance_stats(
         if current_user.role != userRole.STUDENT:
             raise HTTPException(status_code=403, detail="Only students can access this")
 
-        # Fetch all submissions by student
-        submissions = (
-            db.query(Submission)
+        # Fetch all submissions by student together with their assignment titles
+        graded = (
+            db.query(Assignment.title, Submission.grade)
+            .join(Assignment, Submission.assignment_id == Assignment.id)
             .filter(Submission.student_id == current_user.id)
             .all()
         )
 
-        grades_vs_assignments = []
-        for sub in submissions:
-            assignment = db.query(Assignment).filter(Assignment.id == sub.assignment_id).first()
-            if assignment:
-                grades_vs_assignments.append({
-                    "assignment_title": assignment.title,
-                    "grade": sub.grade or 0
-                })
+        grades_vs_assignments = [
+            {"assignment_title": title, "grade": grade or 0}
+            for title, grade in graded
+        ]
 
         # Submission count per month (use submitted_at)
         monthly_counts = (
@@ -279,5 +304,5 @@ def get_student_performance_stats(
         }
 
     except Exception as e:
-        print("❌ ERROR:", e)
+        logger.exception("Performance stats failed")
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
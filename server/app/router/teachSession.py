@@ -1,5 +1,7 @@
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Response, UploadFile, File
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from sqlalchemy.orm.attributes import flag_modified
 from typing import List, AsyncGenerator
 from datetime import datetime
@@ -13,6 +15,7 @@ from app.models.assignment import Assignment
 from app.schemas.teachSession import (
     TeachSessionCreate,
     TeachSessionResponse,
+    TeachSessionSummary,
     TeachSessionUpdate,
     MessageCreate,
     MessageResponse,
@@ -25,21 +28,27 @@ from app.schemas.teachSession import (
     FileUploadResponse
 )
 from app.dependencies.dependencies import get_current_user
-from app.config.db import get_db
-from langchain_google_genai import ChatGoogleGenerativeAI
+from app.config.db import get_async_db, AsyncSessionLocal
+from app.utils.pagination import Page, bounded_page_params, page_params, paginate, finish_page
+from app.utils.llm import get_llm
 from fastapi.responses import StreamingResponse
 import json
+import logging
 import cloudinary
 import cloudinary.uploader
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 load_dotenv()
 
-# Initialize Gemini AI
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    temperature=0.7
-)
+# Session lists were capped at 20 before cursor paging; a plain request still is
+SESSION_PAGE_SIZE = 20
+
+# Initialize Gemini AI; the same client handles whiteboard images
+llm = get_llm(temperature=0.7)
+# Streaming replies and evaluations use their own shared clients
+stream_llm = get_llm(temperature=0.7, streaming=True)
+evaluation_llm = get_llm(temperature=0.3)
 
 # AI Student Prompt Template
 AI_STUDENT_SYSTEM_PROMPT = """You are an enthusiastic AI student learning from your teacher (the human user). 
@@ -67,8 +76,8 @@ Bad responses (too long/explanatory):
 """
 
 
-def build_context_from_references(
-    db: Session,
+async def build_context_from_references(
+    db: AsyncSession,
     reference_note_ids: List[str],
     reference_assignment_ids: List[str]
 ) -> str:
@@ -77,28 +86,31 @@ def build_context_from_references(
     
     # Get notes content
     if reference_note_ids:
-        notes = db.query(Note).filter(Note.id.in_(reference_note_ids)).all()
+        notes = (await db.scalars(select(Note).where(Note.id.in_(reference_note_ids)))).all()
         for note in notes:
             context_parts.append(f"Note - {note.title}:\n{note.content}\n")
     
     # Get assignment content
     if reference_assignment_ids:
-        assignments = db.query(Assignment).filter(Assignment.id.in_(reference_assignment_ids)).all()
+        assignments = (
+            await db.scalars(select(Assignment).where(Assignment.id.in_(reference_assignment_ids)))
+        ).all()
         for assignment in assignments:
             context_parts.append(f"Assignment - {assignment.title}:\n{assignment.description}\n")
     
     return "\n---\n".join(context_parts) if context_parts else ""
 
 
-def get_conversation_history(db: Session, session_id: str, limit: int = 10) -> str:
+async def get_conversation_history(db: AsyncSession, session_id: str, limit: int = 10) -> str:
     """Get recent conversation history"""
     messages = (
-        db.query(TeachSessionMessage)
-        .filter(TeachSessionMessage.session_id == session_id)
-        .order_by(TeachSessionMessage.created_at.desc())
-        .limit(limit)
-        .all()
-    )
+        await db.scalars(
+            select(TeachSessionMessage)
+            .where(TeachSessionMessage.session_id == session_id)
+            .order_by(TeachSessionMessage.created_at.desc())
+            .limit(limit)
+        )
+    ).all()
     messages.reverse()  # Chronological order
     
     history = []
@@ -113,7 +125,7 @@ def get_conversation_history(db: Session, session_id: str, limit: int = 10) -> s
 async def create_teach_session(
     session_data: TeachSessionCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new teach-to-learn session"""
     if not current_user:
@@ -131,8 +143,8 @@ async def create_teach_session(
     )
     
     db.add(new_session)
-    db.commit()
-    db.refresh(new_session)
+    await db.commit()
+    await db.refresh(new_session)
     
     # Add initial AI greeting message
     greeting_message = TeachSessionMessage(
@@ -142,48 +154,67 @@ async def create_teach_session(
         message_type="text"
     )
     db.add(greeting_message)
-    db.commit()
+    await db.commit()
+    await db.refresh(new_session, attribute_names=["messages", "whiteboard_data"])
     
     return new_session
 
 
-@router.get("/sessions", response_model=List[TeachSessionResponse])
+@router.get("/sessions", response_model=List[TeachSessionSummary])
 async def get_user_sessions(
+    response: Response,
+    page: Page = Depends(bounded_page_params(SESSION_PAGE_SIZE)),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 20
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all teach sessions for the current user"""
+    """Get all teach sessions for the current user (metadata only; see /sessions/{id} for content)"""
     if not current_user:
         raise HTTPException(status_code=401, detail="Unauthorized")
     
-    sessions = (
-        db.query(TeachSession)
-        .filter(TeachSession.student_id == current_user.id)
-        .order_by(TeachSession.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    message_count = (
+        select(func.count(TeachSessionMessage.id))
+        .where(TeachSessionMessage.session_id == TeachSession.id)
+        .correlate(TeachSession)
+        .scalar_subquery()
+    )
+    whiteboard_count = (
+        select(func.count(WhiteboardData.id))
+        .where(WhiteboardData.session_id == TeachSession.id)
+        .correlate(TeachSession)
+        .scalar_subquery()
+    )
+    
+    query = (
+        select(TeachSession, message_count, whiteboard_count)
+        .where(TeachSession.student_id == current_user.id)
     )
+    rows = (await db.execute(paginate(query, page, TeachSession.created_at, TeachSession.id))).all()
+    rows = finish_page(rows, page, response, key=lambda row: (row[0].created_at, row[0].id))
     
-    return sessions
+    return [
+        TeachSessionSummary(**session.__dict__, message_count=messages, whiteboard_count=drawings)
+        for session, messages, drawings in rows
+    ]
 
 
 @router.get("/sessions/{session_id}", response_model=TeachSessionResponse)
 async def get_session_by_id(
     session_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific teach session with all messages and whiteboard data"""
     if not current_user:
         raise HTTPException(status_code=401, detail="Unauthorized")
     
-    session = db.query(TeachSession).filter(
-        TeachSession.id == session_id,
-        TeachSession.student_id == current_user.id
-    ).first()
+    session = await db.scalar(
+        select(TeachSession)
+        .where(
+            TeachSession.id == session_id,
+            TeachSession.student_id == current_user.id
+        )
+        .options(selectinload(TeachSession.messages), selectinload(TeachSession.whiteboard_data))
+    )
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -191,21 +222,78 @@ async def get_session_by_id(
     return session
 
 
+@router.get("/sessions/{session_id}/messages", response_model=List[MessageResponse])
+async def get_session_messages(
+    session_id: str,
+    after: str = None,
+    limit: int = 50,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get messages of a session in chronological order.
+    
+    Pass the id of the last message you have as ``after`` to fetch only newer ones.
+    """
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    
+    if limit < 1 or limit > 200:
+        raise HTTPException(status_code=400, detail="Limit must be between 1 and 200")
+    
+    session_exists = await db.scalar(
+        select(TeachSession.id).where(
+            TeachSession.id == session_id,
+            TeachSession.student_id == current_user.id
+        )
+    )
+    
+    if not session_exists:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    query = select(TeachSessionMessage).where(TeachSessionMessage.session_id == session_id)
+    
+    if after:
+        cursor = await db.scalar(
+            select(TeachSessionMessage.created_at).where(
+                TeachSessionMessage.id == after,
+                TeachSessionMessage.session_id == session_id
+            )
+        )
+        if cursor is None:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        # Keyset on (created_at, id) so messages with the same timestamp are not skipped
+        query = query.where(
+            tuple_(TeachSessionMessage.created_at, TeachSessionMessage.id) > tuple_(cursor, after)
+        )
+    
+    messages = (
+        await db.scalars(
+            query.order_by(TeachSessionMessage.created_at, TeachSessionMessage.id).limit(limit)
+        )
+    ).all()
+    
+    return messages
+
+
 @router.put("/sessions/{session_id}", response_model=TeachSessionResponse)
 async def update_teach_session(
     session_id: str,
     update_data: TeachSessionUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a teach session"""
     if not current_user:
         raise HTTPException(status_code=401, detail="Unauthorized")
     
-    session = db.query(TeachSession).filter(
-        TeachSession.id == session_id,
-        TeachSession.student_id == current_user.id
-    ).first()
+    session = await db.scalar(
+        select(TeachSession)
+        .where(
+            TeachSession.id == session_id,
+            TeachSession.student_id == current_user.id
+        )
+        .options(selectinload(TeachSession.messages), selectinload(TeachSession.whiteboard_data))
+    )
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -217,8 +305,7 @@ async def update_teach_session(
     if update_data.status == "completed" and not session.completed_at:
         session.completed_at = datetime.utcnow()
     
-    db.commit()
-    db.refresh(session)
+    await db.commit()
     
     return session
 
@@ -227,22 +314,24 @@ async def update_teach_session(
 async def delete_teach_session(
     session_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a teach session"""
     if not current_user:
         raise HTTPException(status_code=401, detail="Unauthorized")
     
-    session = db.query(TeachSession).filter(
-        TeachSession.id == session_id,
-        TeachSession.student_id == current_user.id
-    ).first()
+    session = await db.scalar(
+        select(TeachSession).where(
+            TeachSession.id == session_id,
+            TeachSession.student_id == current_user.id
+        )
+    )
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    db.delete(session)
-    db.commit()
+    await db.delete(session)
+    await db.commit()
     
     return {"message": "Session deleted successfully"}
 
@@ -252,17 +341,19 @@ async def chat_with_ai_student(
     session_id: str,
     chat_data: ChatRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Send a message to the AI student and get a response"""
     if not current_user:
         raise HTTPException(status_code=401, detail="Unauthorized")
     
     # Get session
-    session = db.query(TeachSession).filter(
-        TeachSession.id == session_id,
-        TeachSession.student_id == current_user.id
-    ).first()
+    session = await db.scalar(
+        select(TeachSession).where(
+            TeachSession.id == session_id,
+            TeachSession.student_id == current_user.id
+        )
+    )
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -276,16 +367,16 @@ async def chat_with_ai_student(
         audio_duration=chat_data.audio_duration
     )
     db.add(student_message)
-    db.commit()
+    await db.commit()
     
     # Build context
-    reference_context = build_context_from_references(
+    reference_context = await build_context_from_references(
         db,
         session.reference_note_ids,
         session.reference_assignment_ids
     )
     
-    conversation_history = get_conversation_history(db, session_id)
+    conversation_history = await get_conversation_history(db, session_id)
     
     # Build prompt for AI - include whiteboard context if available
     whiteboard_context = ""
@@ -311,18 +402,11 @@ Respond as an engaged AI student in 2-4 sentences MAX. Ask a focused question, g
     # Get AI response with vision if whiteboard image is provided
     try:
         if chat_data.whiteboard_image:
-            # Log that we received an image
-            print(f"Received whiteboard image, length: {len(chat_data.whiteboard_image)} chars")
+            logger.debug("Chat with whiteboard image", extra={"session_id": session_id, "image_chars": len(chat_data.whiteboard_image)})
             
-            # Use Gemini Vision model when whiteboard is shared
-            from langchain_google_genai import ChatGoogleGenerativeAI
+            # Gemini is multimodal, so the shared client takes the whiteboard image too
             from langchain_core.messages import HumanMessage
             
-            vision_llm = ChatGoogleGenerativeAI(
-                model="gemini-2.5-flash",
-                temperature=0.7
-            )
-            
             # Create message with image - Gemini expects inline_data format
             message = HumanMessage(
                 content=[
@@ -338,17 +422,13 @@ Respond as an engaged AI student in 2-4 sentences MAX. Ask a focused question, g
                     }
                 ]
             )
-            print("Invoking Gemini with vision model...")
-            ai_response = vision_llm.invoke([message])
+            ai_response = await llm.ainvoke([message])
         else:
-            print("No whiteboard image, using text-only model")
-            ai_response = llm.invoke(prompt)
+            ai_response = await llm.ainvoke(prompt)
             
         ai_content = ai_response.content
     except Exception as e:
-        print(f"AI Error Details: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("AI generation failed", extra={"session_id": session_id})
         raise HTTPException(status_code=500, detail=f"AI generation error: {str(e)}")
     
     # Save AI response
@@ -359,8 +439,8 @@ Respond as an engaged AI student in 2-4 sentences MAX. Ask a focused question, g
         message_type="text"
     )
     db.add(ai_message)
-    db.commit()
-    db.refresh(ai_message)
+    await db.commit()
+    await db.refresh(ai_message)
     
     return ChatResponse(
         ai_message=ai_content,
@@ -374,17 +454,19 @@ async def chat_with_ai_student_stream(
     session_id: str,
     chat_data: ChatRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Send a message to the AI student and get a streaming response"""
     if not current_user:
         raise HTTPException(status_code=401, detail="Unauthorized")
     
     # Get session
-    session = db.query(TeachSession).filter(
-        TeachSession.id == session_id,
-        TeachSession.student_id == current_user.id
-    ).first()
+    session = await db.scalar(
+        select(TeachSession).where(
+            TeachSession.id == session_id,
+            TeachSession.student_id == current_user.id
+        )
+    )
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -398,16 +480,16 @@ async def chat_with_ai_student_stream(
         audio_duration=chat_data.audio_duration
     )
     db.add(student_message)
-    db.commit()
+    await db.commit()
     
     # Build context
-    reference_context = build_context_from_references(
+    reference_context = await build_context_from_references(
         db,
         session.reference_note_ids,
         session.reference_assignment_ids
     )
     
-    conversation_history = get_conversation_history(db, session_id)
+    conversation_history = await get_conversation_history(db, session_id)
     
     # Build prompt for AI
     prompt = f"""{AI_STUDENT_SYSTEM_PROMPT}
@@ -429,27 +511,23 @@ Respond as an engaged AI student.
     async def event_stream() -> AsyncGenerator[str, None]:
         full_response = ""
         try:
-            llm_stream = ChatGoogleGenerativeAI(
-                model="gemini-2.5-flash",
-                temperature=0.7,
-                streaming=True
-            )
-            
-            for chunk in llm_stream.stream(prompt):
+            async for chunk in stream_llm.astream(prompt):
                 if hasattr(chunk, 'content'):
                     content = chunk.content
                     full_response += content
                     yield content
             
-            # Save complete AI response
+            # Save complete AI response. The request-scoped session is already
+            # closed once streaming starts, so use a dedicated one here.
             ai_message = TeachSessionMessage(
                 session_id=session_id,
                 role="ai",
                 content=full_response,
                 message_type="text"
             )
-            db.add(ai_message)
-            db.commit()
+            async with AsyncSessionLocal() as stream_db:
+                stream_db.add(ai_message)
+                await stream_db.commit()
             
         except Exception as e:
             yield f"\n\nError: {str(e)}"
@@ -462,16 +540,18 @@ async def save_whiteboard_data(
     session_id: str,
     whiteboard_data: WhiteboardDataCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Save whiteboard drawing data"""
     if not current_user:
         raise HTTPException(status_code=401, detail="Unauthorized")
     
-    session = db.query(TeachSession).filter(
-        TeachSession.id == session_id,
-        TeachSession.student_id == current_user.id
-    ).first()
+    session = await db.scalar(
+        select(TeachSession).where(
+            TeachSession.id == session_id,
+            TeachSession.student_id == current_user.id
+        )
+    )
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -485,8 +565,8 @@ async def save_whiteboard_data(
     )
     
     db.add(wb_data)
-    db.commit()
-    db.refresh(wb_data)
+    await db.commit()
+    await db.refresh(wb_data)
     
     return wb_data
 
@@ -495,23 +575,29 @@ async def save_whiteboard_data(
 async def get_whiteboard_data(
     session_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all whiteboard data for a session"""
     if not current_user:
         raise HTTPException(status_code=401, detail="Unauthorized")
     
-    session = db.query(TeachSession).filter(
-        TeachSession.id == session_id,
-        TeachSession.student_id == current_user.id
-    ).first()
+    session = await db.scalar(
+        select(TeachSession).where(
+            TeachSession.id == session_id,
+            TeachSession.student_id == current_user.id
+        )
+    )
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    whiteboard_data = db.query(WhiteboardData).filter(
-        WhiteboardData.session_id == session_id
-    ).order_by(WhiteboardData.created_at).all()
+    whiteboard_data = (
+        await db.scalars(
+            select(WhiteboardData)
+            .where(WhiteboardData.session_id == session_id)
+            .order_by(WhiteboardData.created_at)
+        )
+    ).all()
     
     return whiteboard_data
 
@@ -521,22 +607,24 @@ async def evaluate_teaching_session(
     session_id: str,
     evaluation_request: SessionEvaluationRequest = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Generate AI evaluation and feedback for the teaching session"""
     if not current_user:
         raise HTTPException(status_code=401, detail="Unauthorized")
     
-    session = db.query(TeachSession).filter(
-        TeachSession.id == session_id,
-        TeachSession.student_id == current_user.id
-    ).first()
+    session = await db.scalar(
+        select(TeachSession).where(
+            TeachSession.id == session_id,
+            TeachSession.student_id == current_user.id
+        )
+    )
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
     # Get all messages
-    conversation_history = get_conversation_history(db, session_id, limit=1000)
+    conversation_history = await get_conversation_history(db, session_id, limit=1000)
     
     # Build evaluation prompt
     whiteboard_context = ""
@@ -568,14 +656,8 @@ Respond in JSON format:
     try:
         # Use vision model if whiteboard image is provided
         if evaluation_request and evaluation_request.whiteboard_image:
-            from langchain_google_genai import ChatGoogleGenerativeAI
             from langchain_core.messages import HumanMessage
             
-            evaluation_llm = ChatGoogleGenerativeAI(
-                model="gemini-2.5-flash",
-                temperature=0.3
-            )
-            
             message = HumanMessage(
                 content=[
                     {
@@ -590,13 +672,9 @@ Respond in JSON format:
                     }
                 ]
             )
-            response = evaluation_llm.invoke([message])
+            response = await evaluation_llm.ainvoke([message])
         else:
-            evaluation_llm = ChatGoogleGenerativeAI(
-                model="gemini-2.5-flash",
-                temperature=0.3
-            )
-            response = evaluation_llm.invoke(evaluation_prompt)
+            response = await evaluation_llm.ainvoke(evaluation_prompt)
         
         # Parse JSON response
         content = response.content.strip()
@@ -615,8 +693,8 @@ Respond in JSON format:
         session.status = "completed"
         session.completed_at = datetime.utcnow()
         
-        db.commit()
-        db.refresh(session)
+        await db.commit()
+        await db.refresh(session)
         
         return SessionEvaluationResponse(
             session_id=session.id,
@@ -636,16 +714,18 @@ async def upload_session_file(
     session_id: str,
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload a file (PDF, image, etc.) for the teach session"""
     if not current_user:
         raise HTTPException(status_code=401, detail="Unauthorized")
     
-    session = db.query(TeachSession).filter(
-        TeachSession.id == session_id,
-        TeachSession.student_id == current_user.id
-    ).first()
+    session = await db.scalar(
+        select(TeachSession).where(
+            TeachSession.id == session_id,
+            TeachSession.student_id == current_user.id
+        )
+    )
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -665,8 +745,8 @@ async def upload_session_file(
             session.uploaded_files.append(file_url)
             # Mark the JSON field as modified so SQLAlchemy detects the change
             flag_modified(session, "uploaded_files")
-            db.commit()
-            db.refresh(session)
+            await db.commit()
+            await db.refresh(session)
         
         return FileUploadResponse(
             file_url=file_url,
@@ -1,11 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
-from app.config.db import get_db
+from fastapi import APIRouter, Depends, HTTPException, Response, status, UploadFile, File, Form
+from sqlalchemy.orm import Session, joinedload, selectinload
+from app.config.db import get_db, get_read_db
 from app.models.auth import User
 from app.dependencies.dependencies import get_current_user
 from app.models.teacherInsight import TeacherInsight
 from app.schemas.teacherInsight import TeacherInsightCreate, TeacherInsightResponse, TeacherInsightBase
 from app.utils.cloudinary import upload_image, delete_image
+from app.utils.pagination import Page, bounded_page_params, paginate, finish_page
 
 router = APIRouter()
 
@@ -34,14 +35,22 @@ def create_teacher_insight(db: Session = Depends(get_db), current_user: User = D
     return new_insight
 
 @router.get("/teacher-insights", response_model=list[TeacherInsightResponse])
-def get_teacher_insights(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_teacher_insights(
+    response: Response,
+    page: Page = Depends(bounded_page_params()),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
     if not current_user:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Authentication required")
 
-    insights = db.query(TeacherInsight).all()
-    if not insights:
+    query = db.query(TeacherInsight).options(
+        joinedload(TeacherInsight.owner), selectinload(TeacherInsight.members)
+    )
+    insights = finish_page(
+        paginate(query, page, TeacherInsight.created_at, TeacherInsight.id).all(), page, response
+    )
+    if not insights and not page.cursor:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not create any group yet")
-    
-    insights.sort(key=lambda x: x.created_at, reverse=True)
 
     return insights
\ No newline at end of file
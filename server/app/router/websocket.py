@@ -8,8 +8,9 @@ logger = logging.getLogger(__name__)
 sio = socketio.AsyncServer(
     async_mode='asgi',
     cors_allowed_origins='*',
-    logger=True,
-    engineio_logger=True
+    # Per-packet logging is far too chatty for production; see LOG_LEVELS for the socketio/engineio loggers
+    logger=False,
+    engineio_logger=False
 )
 
 # Track connected users per session
@@ -24,14 +25,14 @@ webrtc_peers: Dict[str, Dict[str, dict]] = {}
 @sio.event
 async def connect(sid, environ, auth):
     """Handle client connection"""
-    logger.info(f"Client connected: {sid}")
+    logger.debug(f"Client connected: {sid}")
     await sio.emit('connected', {'sid': sid}, room=sid)
 
 
 @sio.event
 async def disconnect(sid):
     """Handle client disconnection"""
-    logger.info(f"Client disconnected: {sid}")
+    logger.debug(f"Client disconnected: {sid}")
     
     # Remove from all sessions
     for session_id, participants in list(session_participants.items()):
@@ -109,7 +110,7 @@ async def send_message(sid, data):
     if not session_id:
         return {'error': 'Missing session_id'}
     
-    logger.info(f"Broadcasting message in session {session_id}")
+    logger.debug(f"Broadcasting message in session {session_id}")
     
     # Broadcast to all in session
     await sio.emit('new_message', message, room=f"session_{session_id}")
@@ -203,7 +204,7 @@ async def webrtc_signal(sid, data):
             'signal': signal_data
         }, room=target_sid)
         
-        logger.info(f"WebRTC signal forwarded from {from_user_id} to {target_user_id}")
+        logger.debug(f"WebRTC signal forwarded from {from_user_id} to {target_user_id}")
         return {'success': True}
     
     return {'error': 'Target peer not found'}
@@ -19,9 +19,22 @@ class NoteBaseResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class NoteListItem(BaseModel):
+    """List-mode note: an excerpt and the content size instead of the full content"""
+    id: str
+    title: str
+    excerpt: str
+    size: int = Field(..., validation_alias="content_size", description="Content length in characters")
+    created_at: datetime
+    updated_at: datetime
+    owner: UserResponse
+
+    class Config:
+        from_attributes = True
+
 class TeacherNotesResponse(BaseModel):
     count: int
-    notes: list[NoteBaseResponse]
+    notes: list[NoteListItem]
 
     class Config:
         from_attributes = True
@@ -38,7 +38,7 @@ class PeerLearningSessionResponse(PeerLearningSessionBase):
     total_ratings: int
     upvotes: int
     coins_earned: int
-    enrolled_student_ids: List[str]
+    enrolled_student_ids: Optional[List[str]] = None  # Only populated on the detail route
     enrolled_count: int = 0
     started_at: Optional[datetime]
     completed_at: Optional[datetime]
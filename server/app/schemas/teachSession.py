@@ -89,6 +89,24 @@ class TeachSessionResponse(TeachSessionBase):
         from_attributes = True
 
 
+class TeachSessionSummary(TeachSessionBase):
+    """List view of a teach session: metadata and counts, without messages or drawings"""
+    id: str
+    student_id: str
+    status: str
+    duration_minutes: int
+    clarity_score: Optional[int]
+    completeness_score: Optional[int]
+    created_at: datetime
+    updated_at: datetime
+    completed_at: Optional[datetime]
+    message_count: int = 0
+    whiteboard_count: int = 0
+
+    class Config:
+        from_attributes = True
+
+
 # Schema for chat interactions
 class ChatRequest(BaseModel):
     message: str = Field(..., description="Student's teaching message")
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, EmailStr, Field
 from typing import List
 from datetime import datetime
 from typing import Optional
@@ -30,4 +30,29 @@ class TeacherInsightResponse(TeacherInsightBase):
 
 class JoinGroupRequest(BaseModel):
     # user_id: Optional[str]  # student who is joining
-    group_id: str  # group to join
\ No newline at end of file
+    group_id: str  # group to join
+
+
+class RosterEntry(BaseModel):
+    # One student row from a roster import (CSV columns or JSON object keys)
+    full_name: str = Field(..., min_length=1, max_length=100)
+    email: EmailStr
+    password: Optional[str] = Field(None, min_length=6)
+
+
+class RosterRowResult(BaseModel):
+    row: int
+    email: Optional[str] = None
+    status: str = Field(..., description="created, added, already_member or error")
+    detail: Optional[str] = None
+    user_id: Optional[str] = None
+    temporary_password: Optional[str] = Field(None, description="Generated password for new students without one")
+
+
+class RosterImportResponse(BaseModel):
+    group_id: str
+    created: int = 0
+    added: int = 0
+    already_member: int = 0
+    errors: int = 0
+    results: List[RosterRowResult] = []
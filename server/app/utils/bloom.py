@@ -0,0 +1,37 @@
+import math
+import threading
+
+import mmh3
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings.
+
+    ``key in bloom`` is False only if the key was never added; True may be a
+    false positive at roughly ``error_rate`` once ``capacity`` keys are in.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def _positions(self, key: str):
+        # Kirsch-Mitzenmacher: k positions from the two halves of one 128-bit hash
+        h1, h2 = mmh3.hash64(key, signed=False)
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str):
+        positions = list(self._positions(key))
+        with self._lock:
+            for position in positions:
+                self._bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
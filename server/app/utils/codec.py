@@ -0,0 +1,35 @@
+import os
+
+import orjson
+import zstandard
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Cached values at least this large are zstd-compressed before they are stored
+CACHE_COMPRESS_MIN_BYTES = int(os.getenv("CACHE_COMPRESS_MIN_BYTES") or 1024)
+CACHE_COMPRESS_LEVEL = int(os.getenv("CACHE_COMPRESS_LEVEL") or 3)
+
+# JSON never starts with the zstd magic number, so the frame header doubles as the format flag
+ZSTD_MAGIC = zstandard.FRAME_HEADER
+
+
+def compress(data: bytes) -> bytes:
+    if len(data) < CACHE_COMPRESS_MIN_BYTES:
+        return data
+    return zstandard.compress(data, CACHE_COMPRESS_LEVEL)
+
+
+def decompress(data: bytes) -> bytes:
+    if data.startswith(ZSTD_MAGIC):
+        return zstandard.decompress(data)
+    return data
+
+
+def dumps(value) -> bytes:
+    """Serialize a value for the cache: orjson, compressed when large"""
+    return compress(orjson.dumps(value, default=str))
+
+
+def loads(data: bytes):
+    return orjson.loads(decompress(data))
@@ -0,0 +1,48 @@
+import os
+import threading
+
+from dotenv import load_dotenv
+from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
+
+load_dotenv()
+
+GEMINI_MODEL = os.getenv("GEMINI_MODEL") or "gemini-2.5-flash"
+EMBEDDING_MODEL = "models/embedding-001"
+
+# One client per configuration for the whole process, so requests and routers share
+# the underlying HTTP/gRPC connections instead of opening new ones per call
+_clients: dict = {}
+_lock = threading.Lock()
+
+
+def _get_or_create(key: tuple, factory):
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = factory()
+    return client
+
+
+def get_llm(
+    model: str = GEMINI_MODEL,
+    temperature: float = 0.7,
+    streaming: bool = False,
+    **options,
+) -> ChatGoogleGenerativeAI:
+    """Shared chat model for ``(model, temperature, streaming)`` and any extra options.
+
+    Clients are stateless between calls, so the returned instance may be used
+    concurrently by any number of requests. Never mutate it; ask for a
+    different configuration instead.
+    """
+    key = ("chat", model, float(temperature), streaming, tuple(sorted(options.items())))
+    return _get_or_create(
+        key,
+        lambda: ChatGoogleGenerativeAI(model=model, temperature=temperature, streaming=streaming, **options),
+    )
+
+
+def get_embeddings(model: str = EMBEDDING_MODEL) -> GoogleGenerativeAIEmbeddings:
+    return _get_or_create(("embeddings", model), lambda: GoogleGenerativeAIEmbeddings(model=model))
@@ -0,0 +1,117 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import tuple_
+
+
+# Page size used when the client passes ?cursor= without ?limit=
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+# The cursor for the next page is returned in a header so list bodies keep their shape
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass
+class Page:
+    """Requested page: at most ``limit`` rows after ``cursor``; no limit means every row"""
+    limit: Optional[int] = None
+    cursor: Optional[str] = None
+
+    @property
+    def paged(self) -> bool:
+        return self.limit is not None
+
+
+def page_params(
+    cursor: Optional[str] = Query(None, description=f"Opaque cursor from the {NEXT_CURSOR_HEADER} header"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+) -> Page:
+    """FastAPI dependency for ?cursor=&limit= query parameters.
+
+    Without either parameter the whole list is returned, as before pagination
+    existed, so clients that don't follow the cursor header never lose rows.
+    """
+    if limit is None and cursor:
+        limit = DEFAULT_PAGE_SIZE
+    return Page(limit=limit, cursor=cursor)
+
+
+def bounded_page_params(default_limit: int = DEFAULT_PAGE_SIZE):
+    """``page_params`` for lists that are always paged, even without ?limit=.
+
+    Use on routes that were bounded before cursors existed, so a plain request
+    never loads the whole table: ``Depends(bounded_page_params(20))``.
+    """
+    def dependency(
+        cursor: Optional[str] = Query(None, description=f"Opaque cursor from the {NEXT_CURSOR_HEADER} header"),
+        limit: int = Query(default_limit, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    ) -> Page:
+        return Page(limit=limit, cursor=cursor)
+
+    return dependency
+
+
+def encode_cursor(sort_value: datetime, row_id: str) -> str:
+    payload = json.dumps([sort_value.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(sort_value), str(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(query, page: Page, sort_column, id_column, descending: bool = True):
+    """Apply keyset ordering, the cursor condition and the page limit.
+
+    Works with both ``select()`` statements and legacy ``Query`` objects. The
+    row id breaks ties between equal timestamps, so rows are never skipped or
+    repeated across pages. One extra row is fetched so ``finish_page`` can tell
+    whether another page exists. An unpaged request is only ordered.
+    """
+    if page.cursor:
+        sort_value, row_id = decode_cursor(page.cursor)
+        key = tuple_(sort_column, id_column)
+        query = query.where(key < tuple_(sort_value, row_id) if descending else key > tuple_(sort_value, row_id))
+
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    if not page.paged:
+        return query
+    return query.limit(page.limit + 1)
+
+
+def finish_page(rows, page: Page, response: Response, key: Callable = None) -> list:
+    """Drop the look-ahead row and set the next-page cursor header.
+
+    ``key`` returns the (sort value, id) of a row; it defaults to
+    ``(row.created_at, row.id)``.
+    """
+    rows = list(rows)
+    if page.paged and len(rows) > page.limit:
+        rows = rows[:page.limit]
+        sort_value, row_id = key(rows[-1]) if key else (rows[-1].created_at, rows[-1].id)
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(sort_value, row_id)
+    return rows
+
+
+def total_count(query, rows: list, page: Page) -> int:
+    """Rows matched by a legacy ``Query`` across all pages, for ``count`` fields.
+
+    Unpaged results are already complete; a page needs one COUNT over the query.
+    """
+    if not page.paged:
+        return len(rows)
+    return query.order_by(None).count()
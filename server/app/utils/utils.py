@@ -1,9 +1,22 @@
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
 from jose import jwt
-from app.config.config import JWT_SECRET_KEY, ACCESS_TOKEN_EXPIRE_DAYS
+from app.config.config import (
+    JWT_SECRET_KEY,
+    ACCESS_TOKEN_EXPIRE_DAYS,
+    BCRYPT_ROUNDS,
+    PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_MAX_QUEUE,
+)
+from app.config.metrics import Histogram
+import asyncio
+import threading
+import time
+import uuid
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -11,11 +24,86 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+
+class PasswordHashPool:
+    """Bounded thread pool that keeps bcrypt off the event loop and the shared anyio threadpool.
+
+    At most ``max_queue`` calls may be pending (running or waiting); beyond that
+    callers get a 503 instead of piling up behind a login burst.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.active = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_ms = Histogram()
+        self.run_ms = Histogram()
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_queue:
+                self.rejected += 1
+                raise HTTPException(status_code=503, detail="Too many sign-in requests, please retry shortly")
+            self.pending += 1
+        submitted = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            self.wait_ms.observe((started - submitted) * 1000)
+            with self._lock:
+                self.active += 1
+            try:
+                return fn(*args)
+            finally:
+                self.run_ms.observe((time.perf_counter() - started) * 1000)
+                with self._lock:
+                    self.active -= 1
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, task)
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            pending, active = self.pending, self.active
+            completed, rejected = self.completed, self.rejected
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "bcrypt_rounds": BCRYPT_ROUNDS,
+            "active": active,
+            "queued": pending - active,
+            "completed": completed,
+            "rejected": rejected,
+            "wait_ms": self.wait_ms.snapshot(),
+            "run_ms": self.run_ms.snapshot(),
+        }
+
+
+password_hash_pool = PasswordHashPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE)
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_hash_pool.run(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
+
 def create_access_token(data: dict):
     expire = datetime.utcnow() + timedelta(days=ACCESS_TOKEN_EXPIRE_DAYS)
-    data.update({"exp": expire})
+    # jti identifies this token so logout can revoke it
+    data.update({"exp": expire, "jti": uuid.uuid4().hex})
     return jwt.encode(data, JWT_SECRET_KEY, algorithm="HS256")
 
 
 def decode_access_token(token: str):
-    return jwt.decode(token, JWT_SECRET_KEY, algorithms=["HS256"])
\ No newline at end of file
+    return jwt.decode(token, JWT_SECRET_KEY, algorithms=["HS256"])
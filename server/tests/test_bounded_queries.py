@@ -0,0 +1,130 @@
+"""List routes must cost the same number of queries however many rows exist.
+
+Guards against sorting or enriching in Python after loading a whole table
+(the routes order and limit in SQL) and against per-row lazy loads.
+"""
+import importlib
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert
+
+from app.dependencies.principal import Principal
+from app.dependencies.redis_client import local_cache
+from app.dependencies.tiered_cache import tiered_cache
+from app.models.assignment import Assignment
+from app.models.auth import User, group_members, userRole
+from app.models.docsupload import DocsUpload
+from app.models.notes import Note
+from app.models.teacherInsight import TeacherInsight
+from app.utils.pagination import DEFAULT_PAGE_SIZE, NEXT_CURSOR_HEADER
+
+PAGE_SIZE = 5
+
+TEACHER = Principal(id="teacher", email="teacher@example.com", full_name="Teacher", role=userRole.TEACHER)
+STUDENT = Principal(id="student", email="student@example.com", full_name="Student", role=userRole.STUDENT)
+
+# (router module, mount prefix, list path, caller, key of the rows in a wrapped body)
+ROUTES = {
+    "get_my_docs": ("app.router.docsupload", "/docs", "/docs/my-docs", TEACHER, None),
+    "get_teacher_notes_with_docs": ("app.router.docsupload", "/docs", "/docs/teacher-notes-with-docs", STUDENT, "docsuploads"),
+    "get_teacher_notes": ("app.router.notes", "/notes", "/notes/teacher-get-notes", TEACHER, "notes"),
+    "get_assignments (student)": ("app.router.assignment", "/assignments", "/assignments/assignments", STUDENT, None),
+    "get_teacher_insights": ("app.router.teacherInsight", "/insights", "/insights/teacher-insights", TEACHER, None),
+}
+
+
+class Seeder:
+    """Adds groups the student belongs to, each with a note, a doc and an assignment"""
+
+    def __init__(self, SessionLocal):
+        self.SessionLocal = SessionLocal
+        self.added = 0
+        with SessionLocal() as db:
+            for principal in (TEACHER, STUDENT):
+                db.add(User(
+                    id=principal.id,
+                    email=principal.email,
+                    full_name=principal.full_name,
+                    role=principal.role,
+                    hashed_password="x",
+                ))
+            db.commit()
+
+    def add(self, count: int):
+        with self.SessionLocal() as db:
+            for i in range(self.added, self.added + count):
+                group_id = f"group-{i}"
+                db.add(TeacherInsight(
+                    id=group_id,
+                    user_id=TEACHER.id,
+                    group_name=f"Group {i}",
+                    group_des="-",
+                    image_url="https://example.com/group.png",
+                ))
+                db.flush()
+                db.execute(insert(group_members).values(group_id=group_id, user_id=STUDENT.id))
+                db.add(Note(title=f"Note {i}", content="x" * 200, owner_id=TEACHER.id, group_id=group_id))
+                db.add(DocsUpload(filename=f"doc-{i}.pdf", file_url="https://example.com/doc.pdf", owner_id=TEACHER.id, group_id=group_id))
+                db.add(Assignment(
+                    title=f"Assignment {i}",
+                    description="-",
+                    due_date=datetime(2030, 1, 1),
+                    owner_id=TEACHER.id,
+                    group_id=group_id,
+                ))
+            db.commit()
+        self.added += count
+
+
+def fetch_page(client, path, **params):
+    # Each call must reach the database, not the response cache
+    local_cache.clear()
+    tiered_cache.l1.clear()
+    response = client.get(path, params=params)
+    assert response.status_code == 200, response.text
+    return response
+
+
+def setup_route(make_client, session_factories, route):
+    module_name, prefix, path, principal, _ = route
+    router = importlib.import_module(module_name).router
+    return make_client([(router, prefix)], principal), Seeder(session_factories[0])
+
+
+@pytest.mark.parametrize("route", ROUTES.values(), ids=list(ROUTES))
+def test_list_route_query_count_does_not_grow_with_rows(make_client, session_factories, route):
+    path = route[2]
+    client, seeder = setup_route(make_client, session_factories, route)
+
+    seeder.add(2)
+    small = fetch_page(client, path, limit=PAGE_SIZE)
+    small_queries = int(small.headers["X-DB-Query-Count"])
+
+    seeder.add(40)
+    large = fetch_page(client, path, limit=PAGE_SIZE)
+    large_queries = int(large.headers["X-DB-Query-Count"])
+
+    assert large_queries == small_queries
+    assert NEXT_CURSOR_HEADER in large.headers
+    # The page is cut in SQL, not after loading every row
+    statements = client.app.state.statements
+    assert any("LIMIT" in statement for statement in statements), statements
+
+
+@pytest.mark.parametrize("route", ROUTES.values(), ids=list(ROUTES))
+def test_list_route_without_parameters_returns_one_page(make_client, session_factories, route):
+    # What the client sends on first load: no ?limit=, no ?cursor=
+    path, rows_key = route[2], route[4]
+    client, seeder = setup_route(make_client, session_factories, route)
+    seeder.add(DEFAULT_PAGE_SIZE + 10)
+
+    response = fetch_page(client, path)
+    body = response.json()
+    rows = body[rows_key] if rows_key else body
+
+    assert len(rows) == DEFAULT_PAGE_SIZE
+    assert NEXT_CURSOR_HEADER in response.headers
+    if rows_key:
+        # count is the total across pages, not the page size
+        assert body["count"] == DEFAULT_PAGE_SIZE + 10